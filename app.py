@@ -2,14 +2,31 @@ import streamlit as st
 import asyncio
 from dotenv import load_dotenv
 import os
+import time
+from datetime import datetime
 from src.scraper import JobScraper
-from src.matcher import JobMatcher
-from src.pdf_processor import PDFProcessor
+from src.analysis import AnalysisPipeline, AnalysisRequest, NothingToAnalyze
+from src.jobqueue import AnalysisQueue
+from src.results import ResultStore
+from src.history import MatchHistory
+from src.runs import RunJournal
+from src.metrics import LLM_STAGES, SCRAPING_STAGES, collect
 from firecrawl import FirecrawlApp
 
 # Load environment variables
 load_dotenv()
 
+# Job cards rendered per page of the leaderboard
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "50"))
+
+# Rows shown by a history search
+HISTORY_LIMIT = 200
+HISTORY_PERIODS = {"Any time": None, "Last day": 1, "Last week": 7, "Last month": 30, "Last year": 365}
+
+# Hand analyses to the background worker (python -m src.worker) instead of running them in the script
+ANALYSIS_WORKER = os.getenv("ANALYSIS_WORKER", "0") == "1"
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+
 # Set page configuration and theme
 st.set_page_config(
     page_title="jobsearch AI",
@@ -78,6 +95,17 @@ h1, h2, h3, h4 {
 .card .poor-match {
     color: #dc3545 !important;
 }
+.card .cache-badge {
+    display: inline-block;
+    background: #EDF1FF;
+    color: #224DFF;
+    border-radius: 6px;
+    padding: 0.1rem 0.5rem;
+    font-size: 0.8rem;
+    font-weight: 600;
+    vertical-align: middle;
+    margin-left: 0.5rem;
+}
 .card .job-url {
     font-size: 0.93rem;
     word-break: break-all;
@@ -140,50 +168,311 @@ h1, h2, h3, h4 {
 
 # ---------- Functions ----------
 
-async def process_job(scraper, matcher, job, resume_content):
+def render_items(title, items, empty):
+    st.markdown(f"**{title}:**")
+    if items:
+        for item in items:
+            st.markdown(f"- {item}")
+    else:
+        st.markdown(f"_{empty}_")
+
+def render_job_card(record):
+    with st.container():
+        st.markdown(f"""
+        <div class="card">
+            <h3>{record.title}{'<span class="cache-badge">⚡ Cached</span>' if record.cached else ''}</h3>
+            <div class="job-url"><strong>URL:</strong> <a href="{record.url}" target="_blank">{record.url}</a></div>
+            <p><strong>Match:</strong> <span class="match-status {'good-match' if record.is_match else 'poor-match'}">
+                {"✅ Good Match" if record.is_match else "❌ Not a Match"}</span></p>
+            <p><strong>Reason:</strong> {record.reason}</p>
+            <p><strong>Match Score:</strong> <span style="font-weight: 600;">{record.score}%</span></p>
+            <div class="match-score-bar">
+                <div class="match-score-fill {'match-score-low' if record.score < 50 else 'match-score-medium' if record.score < 75 else 'match-score-high'}"
+                    style="width: {record.score}%;"></div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        with st.expander("Details", expanded=False):
+            render_items("Key Strengths", record.key_strengths, "No specific strengths identified")
+            render_items("Areas for Improvement", record.missing_skills, "No specific areas identified")
+            render_items("Suggestions", record.improvement_suggestions, "No specific suggestions available")
+
+def render_results(analysis, controls=False):
+    """
+    Render the leaderboard of an analysis, best matches first.
+
+    While an analysis is running only the first page is shown; once it is
+    finished, `controls` adds filters and pagination (widgets can only be
+    created once per script run).
+    """
+    store = analysis["results"]
+    if store.throttled:
+        st.warning(f"⏳ {len(store.throttled)} jobs were not evaluated because the API kept rate limiting requests. Click Analyze Resume again to retry them; finished results are cached.")
+    if store.cached_count:
+        st.caption(f"⚡ {store.cached_count} of {len(store.records)} results served from cache")
+    if store.prescored_count:
+        st.caption(f"🧮 {store.prescored_count} clear mismatches ruled out locally, without an AI call")
+
+    filters = {}
+    page = 0
+    page_size = RESULTS_PAGE_SIZE
+    if controls and store.records:
+        col1, col2, col3 = st.columns([2, 2, 3])
+        with col1:
+            filters["min_score"] = st.slider("Minimum score", 0, 100, 0, step=5, key="results_min_score")
+        with col2:
+            filters["matches_only"] = st.checkbox("Good matches only", key="results_matches_only")
+        with col3:
+            filters["query"] = st.text_input("Filter by title or company", key="results_query")
+        total = store.count(**filters)
+        pages = max((total + page_size - 1) // page_size, 1)
+        if pages > 1:
+            # Keyed by the filters so changing them goes back to the first page
+            page = st.number_input(
+                f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"results_page_{hash(tuple(filters.values()))}"
+            ) - 1
+        st.caption(f"{total} of {len(store.records)} results")
+    for record in store.page(page, page_size, **filters):
+        render_job_card(record)
+    skipped = analysis["skipped"]
+    if skipped:
+        with st.expander(f"Skipped by pre-filter ({len(skipped)})", expanded=False):
+            for job, similarity in skipped:
+                st.markdown(f"- [{job.title}]({job.url}) at {job.company} (similarity {similarity:.2f})")
+    if analysis.get("metrics") is not None:
+        render_timings(analysis["metrics"])
+
+def render_timings(run_metrics):
+    """Collapsible breakdown of where the time of an analysis went"""
+    with st.expander("⏱️ Timings", expanded=False):
+        bound = run_metrics.bound()
+        if bound:
+            st.markdown(
+                f"**This run was {bound}-bound:** scraping was busy for {run_metrics.busy(SCRAPING_STAGES):.1f}s "
+                f"and the AI model for {run_metrics.busy(LLM_STAGES):.1f}s."
+            )
+        st.dataframe(run_metrics.stages(), use_container_width=True, hide_index=True)
+        facts = []
+        for cache in ("source", "page", "match", "resume"):
+            rate = run_metrics.hit_rate(cache)
+            if rate is not None:
+                facts.append(f"{cache} cache hits: {rate:.0%}")
+        facts.append(f"LLM tokens: {run_metrics.counter('llm_tokens', kind='prompt'):.0f} prompt / {run_metrics.counter('llm_tokens', kind='completion'):.0f} completion")
+        facts.append(f"retries: {run_metrics.counter('retries'):.0f}")
+        facts.append(f"duplicate requests coalesced: {run_metrics.counter('coalesced'):.0f}")
+        facts.append(f"LLM calls avoided: {run_metrics.counter('llm_calls_avoided'):.0f}")
+        screened = run_metrics.counter("screened")
+        if screened:
+            escalations = run_metrics.counter("escalations")
+            facts.append(f"escalated to the final model: {escalations:.0f} of {screened:.0f} ({escalations / screened:.0%})")
+            facts.append(
+                f"LLM cost: ${run_metrics.counter('llm_cost_usd'):.4f} "
+                f"(screen ${run_metrics.counter('llm_cost_usd', tier='screen'):.4f}, "
+                f"final ${run_metrics.counter('llm_cost_usd', tier='final'):.4f})"
+            )
+        else:
+            facts.append(f"LLM cost: ${run_metrics.counter('llm_cost_usd'):.4f}")
+        st.caption(" · ".join(facts))
+
+@st.cache_resource
+def match_history():
+    return MatchHistory()
+
+@st.cache_resource
+def run_journal():
+    return RunJournal()
+
+@st.cache_resource
+def analysis_queue():
+    return AnalysisQueue()
+
+def render_history():
+    """Search past results from the app and the scheduler without scraping or calling the AI model"""
+    with st.expander("🔎 Search past results", expanded=False):
+        col1, col2, col3 = st.columns([3, 2, 2])
+        with col1:
+            query = st.text_input("Keywords", placeholder="e.g. kubernetes remote", key="history_query")
+        with col2:
+            min_score, max_score = st.slider("Score", 0, 100, (0, 100), step=5, key="history_scores")
+        with col3:
+            period = st.selectbox("Evaluated", list(HISTORY_PERIODS), key="history_period")
+        matches_only = st.checkbox("Good matches only", key="history_matches_only")
+        days = HISTORY_PERIODS[period]
+        filters = {
+            "query": query,
+            "min_score": min_score,
+            "max_score": max_score,
+            "since": time.time() - days * 86400 if days else None,
+            "matches_only": matches_only,
+        }
+        history = match_history()
+        total = history.count(**filters)
+        entries = history.search(limit=HISTORY_LIMIT, **filters)
+        if not entries:
+            st.caption("No past results match these filters.")
+            return
+        st.caption(f"Showing {len(entries)} of {total} past results")
+        st.dataframe(
+            [
+                {
+                    "Score": entry.score,
+                    "Title": entry.title,
+                    "Company": entry.company,
+                    "Reason": entry.reason,
+                    "Missing skills": "; ".join(entry.missing_skills),
+                    "Evaluated": datetime.fromtimestamp(entry.evaluated_at).strftime("%Y-%m-%d %H:%M"),
+                    "Source": entry.source,
+                    "URL": entry.url,
+                }
+                for entry in entries
+            ],
+            column_config={"URL": st.column_config.LinkColumn("URL")},
+            use_container_width=True,
+            hide_index=True,
+        )
+
+async def analyze(request):
+    """Run an analysis in this script run, rendering results as they arrive"""
+    scraper = None
+    jobs = []
+    run_metrics = collect()
     try:
-        job_content = await scraper.scrape_job_content(job.url)
-        result = await matcher.evaluate_match(resume_content, job_content)
-        try:
-            int(result["match_score"])
-        except (ValueError, TypeError):
-            result["match_score"] = '0'
-        result["is_match"] = result["is_match"] and int(result["match_score"]) >= 50
-    except Exception as e:
-        result = {
-            "is_match": False,
-            "reason": f"Error processing job: {str(e)}",
-            "match_score": "0",
-            "key_strengths": ["N/A"],
-            "missing_skills": ["N/A"],
-            "improvement_suggestions": ["N/A"]
+        scraper = JobScraper()
+        pipeline = AnalysisPipeline(request, scraper, run_journal(), match_history())
+        with st.spinner("Parsing resume..."):
+            await pipeline.load_resume()
+        if pipeline.run.resumed:
+            st.info(f"♻️ Resuming interrupted run {pipeline.run.id}: finished scrapes and matches are reused")
+        with st.spinner("Scraping job postings..."):
+            await pipeline.scrape()
+        jobs = pipeline.jobs
+        with st.spinner(f"Fetching {len(jobs)} job descriptions..."):
+            failed = await pipeline.fetch()
+        job_results = ResultStore()
+        job_results.extend(failed)
+        job_results.extend(pipeline.select())
+
+        # Results are kept in session state as they arrive so a rerun doesn't lose finished work
+        analysis = {
+            "results": job_results,
+            "skipped": pipeline.skipped,
+            "total": len(jobs),
+            "complete": False,
+            "metrics": run_metrics,
+            "run_id": pipeline.run.id,
         }
-    return job, result
+        st.session_state.analysis = analysis
+        st.markdown("<h2>Job Matches</h2>", unsafe_allow_html=True)
+        if pipeline.skipped:
+            st.caption(f"🔎 Pre-filter sent {len(pipeline.selected)} of {len(pipeline.fetched)} postings to the AI model, saving {len(pipeline.skipped)} LLM calls")
+        progress = st.progress(0.0, text=f"Analyzing {len(pipeline.selected)} jobs...")
+        leaderboard = st.empty()
+        async for batch_results in pipeline.evaluate():
+            analysis["results"].extend(batch_results)
+            done = len(analysis["results"]) + len(pipeline.skipped)
+            progress.progress(done / len(jobs), text=f"Analyzed {done} of {len(jobs)} jobs")
+            with leaderboard.container():
+                render_results(analysis)
+        analysis["complete"] = True
+        pipeline.complete()
+        progress.empty()
+        with leaderboard.container():
+            render_results(analysis, controls=True)
+    except NothingToAnalyze as e:
+        st.warning(str(e))
+        return
+    except Exception as e:
+        if "API key" in str(e) or "authentication" in str(e).lower() or "unauthorized" in str(e).lower():
+            st.markdown('<div class="error-message">❌ Invalid API key. Please check your Firecrawl API key in the sidebar and try again.</div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="error-message">❌ An error occurred: {str(e)}</div>', unsafe_allow_html=True)
+    finally:
+        if scraper is not None:
+            await scraper.aclose()
+    st.success(f"Analysis complete! Processed {len(jobs)} jobs.")
+
+def submit_analysis(request):
+    """Queue an analysis for the worker, cancelling this session's previous one if it is still going"""
+    queue = analysis_queue()
+    previous = st.session_state.get("analysis")
+    if previous and "queued_id" in previous and not previous["finished"]:
+        queue.cancel(previous["queued_id"])
+    st.session_state.analysis = {
+        "results": ResultStore(),
+        "skipped": [],
+        "total": 0,
+        "complete": False,
+        "metrics": None,
+        "run_id": "",
+        "queued_id": queue.submit(request),
+        "seq": 0,
+        "finished": False,
+        "status": "queued",
+        "error": "",
+    }
+
+@st.fragment(run_every=WORKER_POLL_SECONDS)
+def poll_analysis(analysis):
+    """Progress and partial results of an analysis run by the worker, refreshed on a timer"""
+    queue = analysis_queue()
+    # Status first: once it reads finished, every result has been written
+    status = queue.get(analysis["queued_id"])
+    for seq, job, result in queue.results(analysis["queued_id"], analysis["seq"]):
+        analysis["results"].add(job, result)
+        analysis["seq"] = seq
+    if status is None:
+        status_text, analysis["error"] = "failed", "The analysis is no longer in the queue."
+    else:
+        status_text, analysis["error"] = status.status, status.error
+        analysis.update(total=status.total, skipped=status.skipped, run_id=status.run_id)
+    analysis["status"] = status_text
+    if status is None or status.finished:
+        analysis["finished"] = True
+        analysis["complete"] = status_text == "complete"
+        # Rerun the whole page, which renders the finished analysis with its controls and stops polling
+        st.rerun()
+    if status.status == "queued":
+        st.info(f"⏳ Waiting for the analysis worker ({status.ahead} analyses ahead). It runs as `python -m src.worker`.")
+    else:
+        if status.resumed:
+            st.info(f"♻️ Resuming interrupted run {status.run_id}: finished scrapes and matches are reused")
+        done = len(analysis["results"]) + len(status.skipped)
+        if status.total:
+            st.progress(min(done / status.total, 1.0), text=f"Analyzed {done} of {status.total} jobs")
+        if status.stage:
+            st.caption(status.stage)
+    if st.button("Cancel analysis", key="cancel_analysis"):
+        queue.cancel(analysis["queued_id"])
+        st.rerun()
+    render_results(analysis)
 
 async def main():
     st.title("jobsearch: AI Job Matcher")
-    jobs = []
 
     # Sidebar
     with st.sidebar:
         st.markdown("<h3>Configuration</h3>", unsafe_allow_html=True)
-        firecrawl_api_key = st.text_input(
-            "Firecrawl API Key",
-            value=os.getenv("FIRECRAWL_API_KEY", ""),
-            type="password",
-            placeholder="Enter your Firecrawl API key",
-            help="Your Firecrawl API key is required to parse resumes and job listings"
-        )
-        if firecrawl_api_key:
-            firecrawl_api_key = firecrawl_api_key.strip()
-            os.environ["FIRECRAWL_API_KEY"] = firecrawl_api_key
-            api_key_message = st.empty()
-            try:
-                test_app = FirecrawlApp(api_key=firecrawl_api_key)
-                api_key_message.markdown('<p class="success-message">✅ API key successfully set</p>', unsafe_allow_html=True)
-            except Exception as e:
-                api_key_message.markdown('<p class="error-message">❌ Invalid API key. Please check and try again.</p>', unsafe_allow_html=True)
-                os.environ.pop("FIRECRAWL_API_KEY", None)
+        if ANALYSIS_WORKER:
+            # The worker scrapes with its own FIRECRAWL_API_KEY; a key typed here would never reach it
+            st.caption("🔑 Analyses run in the background worker, which uses the Firecrawl API key it was started with.")
+        else:
+            firecrawl_api_key = st.text_input(
+                "Firecrawl API Key",
+                value=os.getenv("FIRECRAWL_API_KEY", ""),
+                type="password",
+                placeholder="Enter your Firecrawl API key",
+                help="Your Firecrawl API key is required to parse resumes and job listings"
+            )
+            if firecrawl_api_key:
+                firecrawl_api_key = firecrawl_api_key.strip()
+                os.environ["FIRECRAWL_API_KEY"] = firecrawl_api_key
+                api_key_message = st.empty()
+                try:
+                    test_app = FirecrawlApp(api_key=firecrawl_api_key)
+                    api_key_message.markdown('<p class="success-message">✅ API key successfully set</p>', unsafe_allow_html=True)
+                except Exception as e:
+                    api_key_message.markdown('<p class="error-message">❌ Invalid API key. Please check and try again.</p>', unsafe_allow_html=True)
+                    os.environ.pop("FIRECRAWL_API_KEY", None)
 
         st.divider()
         st.markdown("<h3>Manage Job URLs</h3>", unsafe_allow_html=True)
@@ -214,6 +503,28 @@ async def main():
                     st.session_state.job_urls.remove(url)
                     st.rerun()
         st.divider()
+        st.markdown("<h3>Pre-filter</h3>", unsafe_allow_html=True)
+        prefilter_top_k = st.number_input(
+            "Max jobs sent to AI (0 = no limit)",
+            min_value=0,
+            value=int(os.getenv("PREFILTER_TOP_K", "0")),
+            step=5,
+            help="Only the postings most similar to your resume are scored by the AI model"
+        )
+        prefilter_threshold = st.slider(
+            "Minimum similarity",
+            min_value=0.0,
+            max_value=1.0,
+            value=float(os.getenv("PREFILTER_THRESHOLD", "0")),
+            step=0.01,
+            help="Postings whose keyword similarity to your resume is below this are skipped"
+        )
+        prescore_enabled = st.checkbox(
+            "Rule out clear mismatches locally",
+            value=os.getenv("PRESCORE_ENABLED", "0") == "1",
+            help="Postings that miss most required skills, are far off your seniority or are on-site elsewhere are scored without the AI model"
+        )
+        st.divider()
         st.markdown("<h3>Resume Analysis</h3>", unsafe_allow_html=True)
         resume_input_method = st.radio(
             "Resume Input Method",
@@ -272,7 +583,9 @@ async def main():
     </div>
     """, unsafe_allow_html=True)
 
-    if not os.getenv("FIRECRAWL_API_KEY"):
+    render_history()
+
+    if not ANALYSIS_WORKER and not os.getenv("FIRECRAWL_API_KEY"):
         st.markdown("""
             <div style="
                 padding: 0.75rem; 
@@ -288,93 +601,37 @@ async def main():
         return
 
     if analyze_button and (resume_url or resume_file or resume_text):
-        try:
-            scraper = JobScraper()
-            matcher = JobMatcher()
-            with st.spinner("Parsing resume..."):
-                if resume_url:
-                    resume_content = await scraper.parse_resume(resume_url)
-                elif resume_file:
-                    pdf_processor = PDFProcessor()
-                    resume_content = pdf_processor.extract_text_from_pdf(resume_file)
-                else:
-                    resume_content = resume_text
-            job_urls = st.session_state.job_urls
-            if not job_urls:
-                st.warning("No job URLs provided. Please add some in the sidebar!")
-                return
-            with st.spinner("Scraping job postings..."):
-                jobs = await scraper.scrape_job_postings(job_urls)
-            if not jobs:
-                st.warning("No jobs found in the provided URLs.")
-                return
-            with st.spinner(f"Analyzing {len(jobs)} jobs..."):
-                tasks = []
-                for job in jobs:
-                    task = process_job(scraper, matcher, job, resume_content)
-                    tasks.append(task)
-                results_container = st.container()
-                with results_container:
-                    st.markdown("<h2>Job Matches</h2>", unsafe_allow_html=True)
-                    job_results = []
-                    for coro in asyncio.as_completed(tasks):
-                        job, result = await coro
-                        try:
-                            int(result["match_score"])
-                        except (ValueError, TypeError):
-                            result["match_score"] = '0'
-                        job_results.append((job, result))
-                    job_results.sort(key=lambda x: int(x[1]["match_score"]), reverse=True)
-                    for job, result in job_results:
-                        with st.container():
-                            st.markdown(f"""
-                            <div class="card">
-                                <h3>{job.title}</h3>
-                                <div class="job-url"><strong>URL:</strong> <a href="{job.url}" target="_blank">{job.url}</a></div>
-                                <p><strong>Match:</strong> <span class="match-status {'good-match' if result["is_match"] else 'poor-match'}">
-                                    {"✅ Good Match" if result["is_match"] else "❌ Not a Match"}</span></p>
-                                <p><strong>Reason:</strong> {result["reason"]}</p>
-                                <p><strong>Match Score:</strong> <span style="font-weight: 600;">{result["match_score"]}%</span></p>
-                                <div class="match-score-bar">
-                                    <div class="match-score-fill {'match-score-low' if int(result["match_score"]) < 50 else 'match-score-medium' if int(result["match_score"]) < 75 else 'match-score-high'}"
-                                        style="width: {result["match_score"]}%;"></div>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            with st.expander("Details", expanded=False):
-                                st.markdown("**Key Strengths:**")
-                                strengths = result["key_strengths"]
-                                if any(strength != "N/A" for strength in strengths):
-                                    for strength in strengths:
-                                        if strength != "N/A":
-                                            st.markdown(f"- {strength}")
-                                else:
-                                    st.markdown("_No specific strengths identified_")
-                                st.markdown("**Areas for Improvement:**")
-                                missing_skills = result["missing_skills"]
-                                if any(skill != "N/A" for skill in missing_skills):
-                                    for skill in missing_skills:
-                                        if skill != "N/A":
-                                            st.markdown(f"- {skill}")
-                                else:
-                                    st.markdown("_No specific areas identified_")
-                                st.markdown("**Suggestions:**")
-                                suggestions = result.get("improvement_suggestions", ["N/A"])
-                                if any(suggestion != "N/A" for suggestion in suggestions):
-                                    for suggestion in suggestions:
-                                        if suggestion != "N/A":
-                                            st.markdown(f"- {suggestion}")
-                                else:
-                                    st.markdown("_No specific suggestions available_")
-        except Exception as e:
-            if "API key" in str(e) or "authentication" in str(e).lower() or "unauthorized" in str(e).lower():
-                st.markdown('<div class="error-message">❌ Invalid API key. Please check your Firecrawl API key in the sidebar and try again.</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="error-message">❌ An error occurred: {str(e)}</div>', unsafe_allow_html=True)
-        if 'jobs' in locals():
-            st.success(f"Analysis complete! Processed {len(jobs)} jobs.")
-        else:
-            st.success("Analysis complete!")
+        request = AnalysisRequest(
+            job_urls=list(st.session_state.job_urls),
+            resume_url=resume_url or "",
+            resume_pdf=resume_file.getvalue() if resume_file else b"",
+            resume_text=resume_text or "",
+            prefilter_top_k=int(prefilter_top_k),
+            prefilter_threshold=float(prefilter_threshold),
+            prescore=prescore_enabled,
+        )
+        if not ANALYSIS_WORKER:
+            await analyze(request)
+            return
+        if not request.job_urls:
+            st.warning("No job URLs provided. Please add some in the sidebar!")
+            return
+        submit_analysis(request)
+    if "analysis" in st.session_state:
+        analysis = st.session_state.analysis
+        st.markdown("<h2>Job Matches</h2>", unsafe_allow_html=True)
+        if "queued_id" in analysis and not analysis["finished"]:
+            poll_analysis(analysis)
+            return
+        status = analysis.get("status")
+        if status == "failed":
+            st.markdown(f'<div class="error-message">❌ An error occurred: {analysis["error"]}</div>', unsafe_allow_html=True)
+        elif status == "cancelled":
+            st.info(f"Analysis cancelled. Showing the {len(analysis['results'])} jobs analyzed before it stopped.")
+        elif not analysis["complete"]:
+            finished = len(analysis["results"]) + len(analysis["skipped"])
+            st.info(f"Showing partial results ({finished} of {analysis['total']} jobs). The analysis was interrupted; click Analyze Resume to resume it without fetching or scoring finished jobs again.")
+        render_results(analysis, controls=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
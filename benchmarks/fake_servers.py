@@ -0,0 +1,276 @@
+"""
+Local stand-ins for the Firecrawl and OpenAI APIs.
+
+One aiohttp server exposes:
+  - Firecrawl v1 `POST /v1/scrape` and `POST/GET /v1/batch/scrape` over a synthetic job board
+  - an OpenAI-compatible `POST /v1/chat/completions` that answers the JobMatcher prompts
+  - the "origin" job pages and resume PDF, so validator requests never leave the machine
+
+Latencies are drawn from a log-normal distribution around a configurable median,
+and each endpoint fails with a configurable probability. The chat endpoint can
+also enforce a requests-per-minute limit, answering with OpenAI-style
+x-ratelimit-* headers and 429s.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+
+from aiohttp import web
+
+TITLES = [
+    "Software Engineer", "Senior Backend Engineer", "Data Scientist", "Machine Learning Engineer",
+    "Frontend Developer", "DevOps Engineer", "Product Manager", "Site Reliability Engineer",
+    "Data Engineer", "Registered Nurse", "Account Executive", "QA Engineer",
+]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Vandelay"]
+SKILLS = [
+    "python", "java", "go", "rust", "typescript", "react", "kubernetes", "docker", "aws", "gcp",
+    "terraform", "postgresql", "kafka", "spark", "pytorch", "tensorflow", "sql", "airflow",
+    "graphql", "django", "fastapi", "linux", "ci/cd", "salesforce", "patient care",
+]
+
+RESUME = """Jane Doe - Senior Software Engineer
+Experience: 8 years building backend services in python and go on aws and kubernetes.
+Skills: python, go, django, fastapi, postgresql, kafka, docker, kubernetes, terraform, aws, sql.
+Education: BSc Computer Science.
+"""
+
+
+class LatencyModel:
+    def __init__(self, median: float, sigma: float, error_rate: float, rng: random.Random):
+        self.median = median
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rng = rng
+
+    async def delay(self):
+        if self.median > 0:
+            await asyncio.sleep(self.rng.lognormvariate(math.log(self.median), self.sigma))
+
+    def fails(self) -> bool:
+        return self.rng.random() < self.error_rate
+
+
+class RequestWindow:
+    """Sliding one-minute window of accepted requests (0 = unlimited)"""
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.accepted = deque()
+
+    def admit(self) -> tuple[bool, dict]:
+        if self.rpm <= 0:
+            return True, {}
+        now = time.monotonic()
+        while self.accepted and self.accepted[0] <= now - 60:
+            self.accepted.popleft()
+        admitted = len(self.accepted) < self.rpm
+        if admitted:
+            self.accepted.append(now)
+        reset = self.accepted[0] + 60 - now if self.accepted else 0.0
+        headers = {
+            "x-ratelimit-limit-requests": str(self.rpm),
+            "x-ratelimit-remaining-requests": str(self.rpm - len(self.accepted)),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        }
+        if not admitted:
+            headers["retry-after"] = f"{math.ceil(reset)}"
+        return admitted, headers
+
+
+class SyntheticCorpus:
+    """Deterministic job board of `postings` jobs spread over `sources` career pages"""
+
+    def __init__(self, base_url: str, sources: int, postings: int, seed: int = 0):
+        rng = random.Random(seed)
+        self.base_url = base_url
+        self.sources = {}
+        self.postings = {}
+        for n in range(postings):
+            source_url = f"{base_url}/careers/{n % sources}"
+            job_url = f"{base_url}/jobs/{n}"
+            title = rng.choice(TITLES)
+            company = COMPANIES[(n % sources) % len(COMPANIES)]
+            skills = rng.sample(SKILLS, 6)
+            self.sources.setdefault(source_url, []).append({"title": title, "url": job_url, "company": company})
+            self.postings[job_url] = (
+                f"# {title} at {company}\n\n"
+                f"We are hiring a {title} to join our team.\n\n"
+                "## Requirements\n" + "".join(f"- {rng.randint(1, 8)}+ years of {skill}\n" for skill in skills)
+                + "\n## Benefits\n- Competitive salary\n- Remote friendly\n"
+            )
+
+    def listing(self, source_url: str) -> str:
+        """Markdown of a careers page"""
+        return "# Open positions\n\n" + "".join(
+            f"- [{job['title']}]({job['url']}) - {job['company']}\n" for job in self.sources[source_url]
+        )
+
+    def source_urls(self) -> list[str]:
+        return list(self.sources)
+
+
+def _chat_answer(prompt: str, rng: random.Random, structured: bool = False) -> str:
+    def evaluation(job_id=None):
+        score = rng.randint(0, 100)
+        result = {
+            "is_match": score >= 50,
+            "reason": "Synthetic evaluation",
+            "match_score": score if structured else str(score),
+            "key_strengths": ["Relevant backend experience"],
+            "missing_skills": ["Domain knowledge"],
+            "improvement_suggestions": ["Highlight measurable impact"],
+        }
+        return {"job_id": job_id, **result} if job_id is not None else result
+
+    job_ids = [int(job_id) for job_id in re.findall(r"### Job (\d+)", prompt)]
+    if structured:
+        # Schema-constrained replies are bare JSON, with batches wrapped in {"results": [...]}
+        return json.dumps({"results": [evaluation(job_id) for job_id in job_ids]} if job_ids else evaluation())
+    body = [evaluation(job_id) for job_id in job_ids] if job_ids else evaluation()
+    return f"```json\n{json.dumps(body)}\n```"
+
+
+def build_app(corpus: SyntheticCorpus, scrape: LatencyModel, llm: LatencyModel, llm_rpm: int = 0) -> web.Application:
+    llm_window = RequestWindow(llm_rpm)
+    batches = {}
+    batch_ids = itertools.count()
+
+    async def scrape_one(url: str, formats: list[str]) -> dict:
+        await scrape.delay()
+        if url in corpus.sources:
+            data = {"metadata": {"sourceURL": url}}
+            if "markdown" in formats:
+                data["markdown"] = corpus.listing(url)
+            if "extract" in formats:
+                data["extract"] = {"jobs": corpus.sources[url]}
+            return data
+        if url in corpus.postings:
+            return {"markdown": corpus.postings[url], "metadata": {"sourceURL": url}}
+        if url.endswith("/resume.pdf"):
+            return {"markdown": RESUME, "metadata": {"sourceURL": url}}
+        raise web.HTTPNotFound(text=json.dumps({"success": False, "error": f"Unknown URL {url}"}))
+
+    async def firecrawl_scrape(request: web.Request) -> web.Response:
+        body = await request.json()
+        if scrape.fails():
+            await scrape.delay()
+            return web.json_response({"success": False, "error": "Synthetic scrape failure"}, status=500)
+        data = await scrape_one(body["url"], body.get("formats", ["markdown"]))
+        return web.json_response({"success": True, "data": data})
+
+    async def firecrawl_batch_start(request: web.Request) -> web.Response:
+        body = await request.json()
+        batch_id = str(next(batch_ids))
+        batches[batch_id] = asyncio.gather(
+            *(scrape_one(url, body.get("formats", ["markdown"])) for url in body["urls"])
+        )
+        return web.json_response({"success": True, "id": batch_id, "url": f"{corpus.base_url}/v1/batch/scrape/{batch_id}"})
+
+    async def firecrawl_batch_status(request: web.Request) -> web.Response:
+        task = batches[request.match_info["batch_id"]]
+        if not task.done():
+            return web.json_response({"success": True, "status": "scraping", "completed": 0, "data": []})
+        data = task.result()
+        return web.json_response({"success": True, "status": "completed", "completed": len(data), "total": len(data), "data": data})
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        admitted, rate_headers = llm_window.admit()
+        if not admitted:
+            return web.json_response(
+                {"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429,
+                headers=rate_headers,
+            )
+        await llm.delay()
+        if llm.fails():
+            return web.json_response(
+                {"error": {"message": "Synthetic server error", "type": "server_error", "code": None}}, status=500
+            )
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        structured = (body.get("response_format") or {}).get("type") == "json_schema"
+        content = _chat_answer(prompt, llm.rng, structured)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        return web.json_response({
+            "id": f"chatcmpl-{next(batch_ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, headers=rate_headers)
+
+    async def origin_job(request: web.Request) -> web.Response:
+        etag = f'"job-{request.match_info["job_id"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text="<html>job</html>", headers={"ETag": etag})
+
+    async def origin_resume(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == '"resume"':
+            return web.Response(status=304)
+        return web.Response(body=b"%PDF-1.4 synthetic", headers={"ETag": '"resume"'})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/scrape", firecrawl_scrape)
+    app.router.add_post("/v1/batch/scrape", firecrawl_batch_start)
+    app.router.add_get("/v1/batch/scrape/{batch_id}", firecrawl_batch_status)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/jobs/{job_id}", origin_job)
+    app.router.add_get("/resume.pdf", origin_resume)
+    return app
+
+
+async def serve(port: int, sources: int, postings: int, scrape: LatencyModel, llm: LatencyModel, seed: int = 0,
+                ready=None, llm_rpm: int = 0):
+    corpus = SyntheticCorpus(f"http://127.0.0.1:{port}", sources, postings, seed)
+    runner = web.AppRunner(build_app(corpus, scrape, llm, llm_rpm), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake Firecrawl and OpenAI endpoints")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--postings", type=int, default=100)
+    parser.add_argument("--scrape-latency", type=float, default=0.2, help="median seconds")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="median seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--scrape-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rpm", type=int, default=0, help="chat requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    asyncio.run(serve(
+        args.port,
+        args.sources,
+        args.postings,
+        LatencyModel(args.scrape_latency, args.latency_sigma, args.scrape_error_rate, rng),
+        LatencyModel(args.llm_latency, args.latency_sigma, args.llm_error_rate, rng),
+        args.seed,
+        llm_rpm=args.llm_rpm,
+    ))
+
+
+if __name__ == "__main__":
+    main()
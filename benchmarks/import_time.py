@@ -0,0 +1,80 @@
+"""
+Import-time budget for the headless scheduler entry point.
+
+Imports `src.scheduler` under `python -X importtime` and fails if the cumulative
+import time exceeds the budget, or if any UI-only or heavy dependency is loaded
+eagerly:
+
+    python -m benchmarks.import_time --budget-ms 300
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+ENTRY_POINT = "src.scheduler"
+
+# Loaded on first use only; importing any of these at start-up is a regression
+LAZY_MODULES = [
+    "streamlit",
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "openai",
+    "numpy",
+    "PyPDF2",
+    "httpx",
+    "pydantic",
+]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Return the cumulative import time of `module` in ms and every module it loaded"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    cumulative = 0.0
+    loaded = set()
+    for match in LINE.finditer(output):
+        name = match.group(4)
+        loaded.add(name)
+        if name == module:
+            cumulative = int(match.group(2)) / 1000
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enforce the scheduler's import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=300)
+    parser.add_argument("--runs", type=int, default=5, help="best of N runs is compared to the budget")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        cumulative, loaded = measure(ENTRY_POINT)
+        timings.append(cumulative)
+
+    failures = []
+    eager = sorted(
+        module for module in LAZY_MODULES
+        if any(name == module or name.startswith(module + ".") for name in loaded)
+    )
+    if eager:
+        failures.append(f"{ENTRY_POINT} eagerly imports {', '.join(eager)}")
+    best = min(timings)
+    if best > args.budget_ms:
+        failures.append(f"{ENTRY_POINT} takes {best:.0f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    print(f"{ENTRY_POINT}: best {best:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Timing behind PDF_PARALLEL_MIN_PAGES: sequential vs process-pool extraction.
+
+Builds text-dense PDFs of each size and times `PDFProcessor.iter_pages` both
+ways, plus the one-off cost of starting the pool:
+
+    python -m benchmarks.pdf_extract --pages 4 16 32 64 256
+"""
+import argparse
+import io
+import os
+import statistics
+import time
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src import pdf_processor
+from src.pdf_processor import PDFProcessor
+
+
+def make_pdf(pages: int, lines: int = 60) -> bytes:
+    """A PDF of `pages` pages, each holding `lines` lines of resume-like text"""
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for page_num in range(pages):
+        page = PageObject.create_blank_page(None, 612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        text = " ".join(
+            f"(Page {page_num} line {line}: Built Python services with PostgreSQL, Kafka and Kubernetes) Tj T*"
+            for line in range(lines)
+        )
+        contents = DecodedStreamObject()
+        contents.set_data(f"BT /F1 9 Tf 40 760 Td 11 TL {text} ET".encode())
+        page[NameObject("/Contents")] = contents
+        writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time sequential and parallel PDF extraction")
+    parser.add_argument("--pages", type=int, nargs="+", default=[4, 16, 32, 64, 256])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--runs", type=int, default=5, help="the median of N runs is reported")
+    args = parser.parse_args()
+
+    # Force the path under test regardless of the configured threshold
+    PDFProcessor.parallel_min_pages = 1
+    started = time.perf_counter()
+    pdf_processor._pool().submit(pdf_processor._extract_pages, make_pdf(1), 0, 1).result()
+    print(f"pool start: {(time.perf_counter() - started) * 1000:.0f} ms (once per process)")
+
+    for pages in args.pages:
+        pdf_bytes = make_pdf(pages)
+        sequential = median_ms(lambda: list(PDFProcessor.iter_pages(pdf_bytes, workers=1)), args.runs)
+        parallel = median_ms(lambda: list(PDFProcessor.iter_pages(pdf_bytes, workers=args.workers)), args.runs)
+        print(
+            f"{pages:>5} pages ({len(pdf_bytes) // 1024} KB): sequential {sequential:7.1f} ms, "
+            f"{args.workers} workers on a warm pool {parallel:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
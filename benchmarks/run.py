@@ -0,0 +1,226 @@
+"""
+End-to-end benchmark of the scheduler pipeline against local fake servers.
+
+Runs one JobScheduler cycle (listings -> content -> match) per corpus size through
+`JobScheduler.run`, the loop `python -m src.scheduler` drives, and
+reports throughput, latency percentiles and peak memory. Thresholds turn the
+run into a CI gate:
+
+    python -m benchmarks.run --postings 10 200 --max-p95-seconds 30 --min-jobs-per-sec 5
+
+The throughput floor only applies to corpora of at least --throughput-min-postings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: list[float]) -> dict:
+    return {f"p{pct}": round(percentile(values, pct), 4) for pct in (50, 95, 99)}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_servers(args, postings: int) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_servers",
+        "--port", str(port),
+        "--sources", str(min(args.sources, postings)),
+        "--postings", str(postings),
+        "--scrape-latency", str(args.scrape_latency),
+        "--llm-latency", str(args.llm_latency),
+        "--latency-sigma", str(args.latency_sigma),
+        "--scrape-error-rate", str(args.scrape_error_rate),
+        "--llm-error-rate", str(args.llm_error_rate),
+        "--llm-rpm", str(args.llm_rpm),
+        "--seed", str(args.seed),
+    ])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Fake servers did not start within 30 seconds")
+
+
+class Timings:
+    """Wraps scheduler hot paths to record per-call and per-job latencies"""
+
+    def __init__(self, scheduler):
+        self.fetch = []
+        self.match = []
+        self.completed = []
+        self.started = time.monotonic()
+
+        scrape_job_content = scheduler.scraper.scrape_job_content
+        evaluate_batch = scheduler.matcher.evaluate_batch
+        record = scheduler.store.record
+
+        async def timed_scrape_job_content(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                return await scrape_job_content(*args, **kwargs)
+            finally:
+                self.fetch.append(time.monotonic() - start)
+
+        async def timed_evaluate_batch(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                return await evaluate_batch(*args, **kwargs)
+            finally:
+                self.match.append(time.monotonic() - start)
+
+        def timed_record(*args, **kwargs):
+            self.completed.append(time.monotonic() - self.started)
+            return record(*args, **kwargs)
+
+        scheduler.scraper.scrape_job_content = timed_scrape_job_content
+        scheduler.matcher.evaluate_batch = timed_evaluate_batch
+        scheduler.store.record = timed_record
+
+
+async def run_cycles(base_url: str, warm: bool) -> list[dict]:
+    # Imported late so the module-level configuration sees the benchmark environment
+    from src.scheduler import JobScheduler
+
+    scheduler = JobScheduler()
+    scheduler.resume_url = f"{base_url}/resume.pdf"
+    reports = []
+    try:
+        for phase in ("cold", "warm") if warm else ("cold",):
+            timings = Timings(scheduler)
+            started = time.monotonic()
+            # Through the entry point `python -m src.scheduler` runs, not just the cycle
+            await scheduler.run(cycles=1)
+            elapsed = time.monotonic() - started
+            stats = dict(scheduler.stats)
+            done = len(timings.completed) + stats.get("unchanged", 0)
+            reports.append({
+                "phase": phase,
+                "elapsed_seconds": round(elapsed, 3),
+                "jobs_per_sec": round(done / elapsed, 2) if elapsed else 0.0,
+                "time_to_result": summarize(timings.completed),
+                "fetch_latency": summarize(timings.fetch),
+                "match_latency": summarize(timings.match),
+                "stats": stats,
+            })
+            # Undo the wrappers before the next phase re-applies them
+            for owner, name in ((scheduler.scraper, "scrape_job_content"), (scheduler.matcher, "evaluate_batch"), (scheduler.store, "record")):
+                vars(owner).pop(name, None)
+    finally:
+        await scheduler.scraper.aclose()
+    return reports
+
+
+def run_benchmark(args, postings: int) -> dict:
+    process, base_url = start_fake_servers(args, postings)
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            sources = [f"{base_url}/careers/{i}" for i in range(min(args.sources, postings))]
+            sources_file = os.path.join(cache_dir, "job_urls.txt")
+            with open(sources_file, "w") as f:
+                f.write("\n".join(sources))
+            os.environ.update({
+                "FIRECRAWL_API_KEY": "fc-benchmark",
+                "FIRECRAWL_API_URL": base_url,
+                "OPENAI_API_KEY": "sk-benchmark",
+                "OPENAI_API_BASE": f"{base_url}/v1",
+                "JOBSEARCH_CACHE_DIR": os.path.join(cache_dir, "cache"),
+                "JOB_URLS_FILE": sources_file,
+                # No local budgets: the client only learns limits from the fake server's headers
+                "LLM_RPM": "0",
+                "LLM_TPM": "0",
+                "FIRECRAWL_RPM": "0",
+            })
+            phases = asyncio.run(run_cycles(base_url, args.warm))
+    finally:
+        process.terminate()
+        process.wait()
+    return {"postings": postings, "sources": len(sources), "phases": phases, "peak_rss_mb": peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job matching pipeline against local fake servers")
+    parser.add_argument("--postings", type=int, nargs="+", default=[10, 100, 1000], help="corpus sizes to run")
+    parser.add_argument("--sources", type=int, default=20, help="career pages the postings are spread over")
+    parser.add_argument("--scrape-latency", type=float, default=0.2, help="median Firecrawl latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="median chat completion latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal spread of latencies")
+    parser.add_argument("--scrape-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rpm", type=int, default=0, help="rate limit enforced by the fake chat endpoint (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="run a second cycle against the warm caches")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--min-jobs-per-sec", type=float, help="fail if cold throughput falls below this")
+    parser.add_argument(
+        "--throughput-min-postings", type=int, default=100,
+        help="only hold corpora of at least this many postings to --min-jobs-per-sec; smaller runs are latency-bound",
+    )
+    parser.add_argument("--max-p95-seconds", type=float, help="fail if cold p95 time-to-result exceeds this")
+    parser.add_argument("--max-peak-mb", type=float, help="fail if peak RSS exceeds this")
+    args = parser.parse_args()
+
+    reports = []
+    failures = []
+    for postings in args.postings:
+        report = run_benchmark(args, postings)
+        reports.append(report)
+        cold = report["phases"][0]
+        print(
+            f"{postings:>6} postings: {cold['jobs_per_sec']:>8.2f} jobs/s, "
+            f"p50/p95/p99 {cold['time_to_result']['p50']:.2f}/{cold['time_to_result']['p95']:.2f}/"
+            f"{cold['time_to_result']['p99']:.2f}s, peak {report['peak_rss_mb']} MB",
+            file=sys.stderr,
+        )
+        # A handful of postings finishes in a few LLM round trips, so its jobs/s says nothing about throughput
+        if (args.min_jobs_per_sec is not None and postings >= args.throughput_min_postings
+                and cold["jobs_per_sec"] < args.min_jobs_per_sec):
+            failures.append(f"{postings} postings: {cold['jobs_per_sec']} jobs/s < {args.min_jobs_per_sec}")
+        if args.max_p95_seconds is not None and cold["time_to_result"]["p95"] > args.max_p95_seconds:
+            failures.append(f"{postings} postings: p95 {cold['time_to_result']['p95']}s > {args.max_p95_seconds}s")
+        if args.max_peak_mb is not None and report["peak_rss_mb"] > args.max_peak_mb:
+            failures.append(f"{postings} postings: peak {report['peak_rss_mb']} MB > {args.max_peak_mb} MB")
+
+    output = json.dumps(reports, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
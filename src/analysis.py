@@ -0,0 +1,171 @@
+import asyncio
+import base64
+import io
+import json
+from dataclasses import asdict, dataclass
+
+from .cache import content_hash
+from .matcher import JobMatcher
+from .prefilter import JobPreFilter
+from .prescore import PreScorer
+from .ratelimit import Throttled
+from .resume import ResumeLoader
+from .runs import run_key
+
+
+def error_result(reason):
+    return {
+        "is_match": False,
+        "reason": reason,
+        "match_score": "0",
+        "key_strengths": ["N/A"],
+        "missing_skills": ["N/A"],
+        "improvement_suggestions": ["N/A"],
+        "error": True
+    }
+
+
+def throttled_result(reason):
+    # Rate limited after every retry: kept out of the leaderboard rather than scored 0
+    return {"throttled": True, "reason": reason}
+
+
+def failed_result(error):
+    if isinstance(error, Throttled):
+        return throttled_result(str(error))
+    return error_result(f"Error processing job: {str(error)}")
+
+
+async def fetch_job_content(scraper, job, run=None):
+    try:
+        return job, await scraper.scrape_job_content(job.url, run)
+    except Exception as e:
+        return job, e
+
+
+async def process_jobs(matcher, batch, resume_content):
+    """Evaluate a batch of (job, job_content) pairs with one matcher request"""
+    try:
+        results = await matcher.evaluate_batch(resume_content, [job_content for _, job_content in batch])
+        # Scores are normalized to ints once, when the ResultStore records them
+        return list(zip((job for job, _ in batch), results))
+    except Exception as e:
+        return [(job, failed_result(e)) for job, _ in batch]
+
+
+class NothingToAnalyze(Exception):
+    """The analysis has no job URLs, or its job URLs list no jobs"""
+
+
+@dataclass
+class AnalysisRequest:
+    """Inputs of one analysis: the resume (by URL, PDF bytes or text), the job URLs and the filter settings"""
+    job_urls: list[str]
+    resume_url: str = ""
+    resume_pdf: bytes = b""
+    resume_text: str = ""
+    prefilter_top_k: int = 0
+    prefilter_threshold: float = 0.0
+    prescore: bool = False
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["resume_pdf"] = base64.b64encode(self.resume_pdf).decode()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text: str) -> "AnalysisRequest":
+        data = json.loads(text)
+        data["resume_pdf"] = base64.b64decode(data.get("resume_pdf", ""))
+        return cls(**data)
+
+
+class AnalysisPipeline:
+    """
+    The scrape-and-match pipeline of one analysis, step by step.
+
+    The app runs it in-process and the worker runs it for queued analyses;
+    each step is a method so the caller can report progress between them.
+    The analysis is a checkpointed run of `journal`: running the same
+    request again resumes it, reusing finished scrapes and matches.
+    """
+
+    def __init__(self, request: AnalysisRequest, scraper, journal, history, source: str = "app"):
+        self.request = request
+        self.scraper = scraper
+        self.journal = journal
+        self.history = history
+        self.source = source
+        self.matcher = JobMatcher(prescorer=PreScorer(enabled=request.prescore))
+        self.resume_content = ""
+        self.resume_hash = ""
+        self.run = None
+        self.jobs = []
+        self.fetched = []
+        self.selected = []
+        self.skipped = []
+
+    async def load_resume(self):
+        """Parse the resume and start (or resume) the run for these inputs"""
+        request = self.request
+        resume_loader = ResumeLoader(self.scraper)
+        if request.resume_url:
+            self.resume_content = await resume_loader.load_url(request.resume_url)
+        elif request.resume_pdf:
+            self.resume_content = resume_loader.load_pdf(io.BytesIO(request.resume_pdf))
+        else:
+            self.resume_content = request.resume_text
+        if not request.job_urls:
+            raise NothingToAnalyze("No job URLs provided. Please add some in the sidebar!")
+        self.resume_hash = content_hash(self.resume_content or "")
+        # Analyses from the app resume each other whether they ran in-process or in the worker
+        self.run = self.journal.start(
+            "app",
+            run_key(self.resume_hash, request.job_urls, request.prefilter_top_k, request.prefilter_threshold,
+                    request.prescore, self.matcher.prompt_version),
+        )
+
+    async def scrape(self):
+        self.jobs = await self.scraper.scrape_job_postings(self.request.job_urls, self.run)
+        if not self.jobs:
+            raise NothingToAnalyze("No jobs found in the provided URLs.")
+
+    async def fetch(self) -> list:
+        """Fetch every job description; returns the failed jobs as (job, result) pairs"""
+        fetched = await asyncio.gather(*(fetch_job_content(self.scraper, job, self.run) for job in self.jobs))
+        self.fetched = [(job, content) for job, content in fetched if not isinstance(content, Exception)]
+        return [(job, failed_result(content)) for job, content in fetched if isinstance(content, Exception)]
+
+    def select(self) -> list:
+        """Pre-filter the fetched jobs; returns the matches a resumed run already finished"""
+        prefilter = JobPreFilter(top_k=self.request.prefilter_top_k, threshold=self.request.prefilter_threshold)
+        selected, skipped = prefilter.select(self.resume_content, self.fetched, [content for _, content in self.fetched])
+        self.selected = [pair for pair, _ in selected]
+        self.skipped = [(job, similarity) for (job, _), similarity in skipped]
+        finished = self.run.outputs("matches")
+        return [(job, finished[job.url]) for job, _ in self.selected if job.url in finished]
+
+    async def evaluate(self):
+        """Evaluate the selected jobs not finished yet, yielding each batch's (job, result) pairs as it completes"""
+        finished = self.run.outputs("matches")
+        pairs = [(job, content) for job, content in self.selected if job.url not in finished]
+        tasks = [
+            asyncio.ensure_future(process_jobs(self.matcher, pairs[i:i + self.matcher.batch_size], self.resume_content))
+            for i in range(0, len(pairs), self.matcher.batch_size)
+        ]
+        try:
+            for coro in asyncio.as_completed(tasks):
+                batch_results = await coro
+                self.history.record_many(batch_results, self.resume_hash, self.source)
+                for job, result in batch_results:
+                    if not result.get("throttled") and not result.get("error"):
+                        self.run.put("matches", job.url, result)
+                yield batch_results
+        finally:
+            # A cancelled analysis doesn't leave its batches calling the LLM
+            for task in tasks:
+                task.cancel()
+
+    def complete(self):
+        self.run.complete()
+
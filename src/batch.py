@@ -0,0 +1,227 @@
+"""
+Match many resumes against one job corpus.
+
+The job boards are scraped and every posting is fetched once; the resumes x
+postings matrix is then evaluated concurrently and written as one row per
+pair to Parquet or CSV. Pairs the pre-filter skips are written too, flagged
+`prefiltered`, with their similarity and no score:
+
+    python -m src.batch resumes/ extra_candidate.pdf --jobs-file job_urls.txt --output matches.parquet
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from . import metrics
+from .matcher import JobMatcher
+from .prefilter import JobPreFilter
+from .ratelimit import Throttled
+from .resume import ResumeLoader
+from .scraper import JobScraper
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = (".pdf", ".txt", ".md")
+
+COLUMNS = [
+    "candidate", "resume", "job_title", "company", "job_url", "match_score", "is_match", "reason",
+    "key_strengths", "missing_skills", "improvement_suggestions", "similarity", "prefiltered", "cached", "prescored", "error",
+]
+
+
+# Result of a pair the pre-filter kept from the matcher
+PREFILTERED = {"is_match": False, "match_score": 0, "reason": "Skipped by the pre-filter", "prefiltered": True}
+
+
+@dataclass
+class Candidate:
+    name: str
+    source: str
+    text: str
+
+
+def expand_resume_sources(sources: list[str]) -> list[str]:
+    """Resume URLs and files, with directories replaced by the resumes they contain"""
+    expanded = []
+    for source in sources:
+        if os.path.isdir(source):
+            expanded.extend(
+                os.path.join(source, name) for name in sorted(os.listdir(source))
+                if name.lower().endswith(RESUME_EXTENSIONS)
+            )
+        else:
+            expanded.append(source)
+    return expanded
+
+
+def read_lines(path: str) -> list[str]:
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def candidate_name(source: str) -> str:
+    return os.path.splitext(os.path.basename(source.rstrip("/")))[0] or source
+
+
+async def load_candidate(loader: ResumeLoader, source: str) -> Candidate:
+    if source.startswith(("http://", "https://")):
+        text = await loader.load_url(source)
+    elif source.lower().endswith(".pdf"):
+        with open(source, "rb") as f:
+            text = loader.load_pdf(f)
+    else:
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+    return Candidate(candidate_name(source), source, text)
+
+
+def row(candidate: Candidate, job, similarity: float, result: dict) -> dict:
+    try:
+        score = int(result.get("match_score"))
+    except (ValueError, TypeError):
+        score = 0
+    return {
+        "candidate": candidate.name,
+        "resume": candidate.source,
+        "job_title": job.title,
+        "company": job.company,
+        "job_url": job.url,
+        "match_score": score,
+        "is_match": bool(result.get("is_match")) and score >= 50,
+        "reason": result.get("reason", ""),
+        "key_strengths": "; ".join(str(item) for item in result.get("key_strengths", []) if item != "N/A"),
+        "missing_skills": "; ".join(str(item) for item in result.get("missing_skills", []) if item != "N/A"),
+        "improvement_suggestions": "; ".join(str(item) for item in result.get("improvement_suggestions", []) if item != "N/A"),
+        "similarity": round(similarity, 4),
+        "prefiltered": bool(result.get("prefiltered")),
+        "cached": bool(result.get("cached")),
+        "prescored": bool(result.get("prescored")),
+        "error": "throttled" if result.get("throttled") else ("evaluation failed" if result.get("error") else ""),
+    }
+
+
+def write_rows(rows: list[dict], path: str):
+    """Write the matrix as Parquet (for a .parquet path) or CSV"""
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(rows, schema=pa.schema([
+            (name, pa.int32() if name == "match_score" else pa.float32() if name == "similarity"
+             else pa.bool_() if name in ("is_match", "prefiltered", "cached", "prescored") else pa.string())
+            for name in COLUMNS
+        ])), path)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class BatchMatcher:
+    """
+    Evaluates every candidate against every job from one shared scrape.
+
+    Work is split into (candidate, chunk of postings) units of one matcher
+    batch each, at most `concurrency` of which are in flight; the shared rate
+    limiter paces the requests they send.
+    """
+
+    def __init__(self, scraper: JobScraper, matcher: JobMatcher | None = None, prefilter: JobPreFilter | None = None,
+                 concurrency: int | None = None):
+        self.scraper = scraper
+        self.matcher = matcher or JobMatcher()
+        self.prefilter = prefilter or JobPreFilter()
+        self.concurrency = concurrency or int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+    async def fetch_corpus(self, source_urls: list[str]) -> list[tuple]:
+        """Every (job, content) pair on the job boards, each posting fetched once"""
+        jobs = await self.scraper.scrape_job_postings(source_urls)
+        unique = list({job.url: job for job in jobs}.values())
+        contents = await asyncio.gather(*(self.scraper.scrape_job_content(job.url) for job in unique), return_exceptions=True)
+        corpus = []
+        for job, content in zip(unique, contents):
+            if isinstance(content, Exception):
+                logger.error(f"Error fetching job {job.url}: {str(content)}")
+                continue
+            corpus.append((job, content))
+        logger.info(f"Fetched {len(corpus)} of {len(unique)} postings")
+        return corpus
+
+    async def evaluate(self, candidates: list[Candidate], corpus: list[tuple]) -> list[dict]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        documents = [content for _, content in corpus]
+
+        async def evaluate_chunk(candidate, chunk):
+            async with semaphore:
+                try:
+                    results = await self.matcher.evaluate_batch(candidate.text, [content for (_, content), _ in chunk])
+                except Throttled as e:
+                    logger.warning(f"Rate limited evaluating {candidate.name}: {str(e)}")
+                    results = [{"throttled": True, "reason": str(e)} for _ in chunk]
+            return [row(candidate, job, similarity, result) for ((job, _), similarity), result in zip(chunk, results)]
+
+        units = []
+        skipped_rows = []
+        for candidate in candidates:
+            selected, skipped = self.prefilter.select(candidate.text, corpus, documents)
+            if skipped:
+                logger.info(f"Pre-filter skipped {len(skipped)} of {len(corpus)} postings for {candidate.name}")
+            skipped_rows.extend(row(candidate, job, similarity, PREFILTERED) for (job, _), similarity in skipped)
+            size = self.matcher.batch_size
+            units.extend(evaluate_chunk(candidate, selected[i:i + size]) for i in range(0, len(selected), size))
+
+        rows = []
+        for chunk_rows in await asyncio.gather(*units):
+            rows.extend(chunk_rows)
+        return rows + skipped_rows
+
+    async def run(self, resume_sources: list[str], source_urls: list[str]) -> list[dict]:
+        loader = ResumeLoader(self.scraper)
+        candidates = []
+        for source in expand_resume_sources(resume_sources):
+            try:
+                candidates.append(await load_candidate(loader, source))
+            except Exception as e:
+                logger.error(f"Error loading resume {source}: {str(e)}")
+        logger.info(f"Loaded {len(candidates)} resumes")
+        corpus = await self.fetch_corpus(source_urls)
+        return await self.evaluate(candidates, corpus)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Match many resumes against the same job boards")
+    parser.add_argument("resumes", nargs="*", help="resume PDFs, text files, URLs or directories of resumes")
+    parser.add_argument("--resumes-file", help="file listing resume paths or URLs, one per line")
+    parser.add_argument("--jobs-file", default=os.getenv("JOB_URLS_FILE"), help="job board URLs, one per line")
+    parser.add_argument("--output", default="matches.parquet", help="a .parquet path, or anything else for CSV")
+    parser.add_argument("--concurrency", type=int, help="matcher batches in flight (BATCH_MAX_CONCURRENCY)")
+    args = parser.parse_args()
+
+    resume_sources = args.resumes + (read_lines(args.resumes_file) if args.resumes_file else [])
+    if not resume_sources or not args.jobs_file:
+        parser.error("at least one resume and --jobs-file (or JOB_URLS_FILE) are required")
+
+    run_metrics = metrics.collect()
+    scraper = JobScraper()
+    try:
+        rows = await BatchMatcher(scraper, concurrency=args.concurrency).run(resume_sources, read_lines(args.jobs_file))
+    finally:
+        await scraper.aclose()
+    write_rows(rows, args.output)
+    logger.info(f"Wrote {len(rows)} matches to {args.output}")
+    logger.info(f"Timings: {run_metrics.summary()}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(main())
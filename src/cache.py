@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+
+def cache_dir() -> str:
+    return os.getenv("JOBSEARCH_CACHE_DIR", ".jobsearch_cache")
+
+
+def open_db(filename: str) -> sqlite3.Connection:
+    """Open a SQLite database in the cache directory, shareable across threads and processes"""
+    os.makedirs(cache_dir(), exist_ok=True)
+    conn = sqlite3.connect(
+        os.path.join(cache_dir(), filename),
+        timeout=30,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    url: str
+    markdown: str
+    content_hash: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class PageCache:
+    """
+    On-disk cache of scraped page markdown.
+
+    Pages are keyed by URL and point at a content-addressed blob, so identical
+    postings reachable from several URLs are stored once. Entries are fresh for
+    `ttl` seconds; after that they can be revalidated against the origin's
+    ETag/Last-Modified instead of being scraped again. The least recently used
+    pages are evicted once the stored markdown exceeds `max_bytes`.
+    """
+
+    def __init__(self, filename: str = "pages.db", ttl: float | None = None, max_bytes: int | None = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("PAGE_CACHE_TTL_HOURS", "24")) * 3600
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("PAGE_CACHE_MAX_MB", "256")) * 1024 * 1024
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                markdown TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+            """
+        )
+
+    def get(self, url: str) -> CachedPage | None:
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT p.content_hash, b.markdown, p.etag, p.last_modified, p.fetched_at
+                FROM pages p JOIN blobs b ON b.hash = p.content_hash
+                WHERE p.url = ?
+                """,
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return CachedPage(url, row[1], row[0], row[2], row[3], row[4])
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl
+
+    def put(self, url: str, markdown: str, etag: str | None = None, last_modified: str | None = None) -> str:
+        digest = content_hash(markdown)
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, markdown, size) VALUES (?, ?, ?)",
+                    (digest, markdown, len(markdown.encode("utf-8"))),
+                )
+                self.conn.execute(
+                    """
+                    INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, fetched_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (url, digest, etag, last_modified, now, now),
+                )
+                self._evict()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return digest
+
+    def touch(self, url: str):
+        """Mark a page as revalidated against its origin"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            urls = [row[0] for row in self.conn.execute("SELECT url FROM pages ORDER BY accessed_at LIMIT 50")]
+            if not urls:
+                break
+            self.conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+            self.conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT content_hash FROM pages)")
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+class MatchCache:
+    """
+    Persistent memo of JobMatcher results.
+
+    A result is only reused when the normalized resume, the job content, the
+    model and the prompt/schema version are all unchanged.
+    """
+
+    def __init__(self, filename: str = "matches.db"):
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS matches (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def key(resume: str, job_posting: str, model: str, prompt_version: str) -> str:
+        resume_hash = content_hash(" ".join(resume.split()))
+        return content_hash(f"{resume_hash}:{content_hash(job_posting)}:{model}:{prompt_version}")
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self.conn.execute("SELECT result FROM matches WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches (key, result, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time()),
+            )
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from .cache import open_db
+
+_TERM = re.compile(r"\w[\w+#.-]*")
+
+
+def fts_query(text: str) -> str:
+    """
+    A safe FTS5 query matching every word of `text` as a prefix.
+
+    User input is never passed through as FTS syntax: each word is quoted,
+    so "c++", "node.js" or a stray quote can't make the query invalid.
+    """
+    return " ".join(f'"{term}"*' for term in _TERM.findall(text.replace('"', " ")))
+
+
+def _items(values) -> str:
+    return "\n".join(str(value) for value in values or () if value != "N/A")
+
+
+@dataclass
+class HistoryEntry:
+    url: str
+    title: str
+    company: str
+    score: int
+    is_match: bool
+    reason: str
+    key_strengths: list[str]
+    missing_skills: list[str]
+    source: str
+    evaluated_at: float
+
+
+class MatchHistory:
+    """
+    Searchable record of every match result, from the app and the scheduler.
+
+    Results are kept per (job URL, resume) with their latest evaluation, and
+    indexed with SQLite FTS5 over title, company, reason, strengths and
+    missing skills, so past results can be searched and filtered by score and
+    date without scraping or calling the LLM again.
+    """
+
+    def __init__(self, filename: str = "history.db"):
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS matches (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                is_match INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                key_strengths TEXT NOT NULL,
+                missing_skills TEXT NOT NULL,
+                source TEXT NOT NULL,
+                evaluated_at REAL NOT NULL,
+                UNIQUE (url, resume_hash)
+            );
+            CREATE INDEX IF NOT EXISTS matches_score ON matches (score, evaluated_at);
+            CREATE INDEX IF NOT EXISTS matches_evaluated_at ON matches (evaluated_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS matches_fts USING fts5(
+                title, company, reason, key_strengths, missing_skills,
+                content='matches', content_rowid='id', tokenize="unicode61 tokenchars '+#'"
+            );
+            CREATE TRIGGER IF NOT EXISTS matches_ai AFTER INSERT ON matches BEGIN
+                INSERT INTO matches_fts (rowid, title, company, reason, key_strengths, missing_skills)
+                VALUES (new.id, new.title, new.company, new.reason, new.key_strengths, new.missing_skills);
+            END;
+            CREATE TRIGGER IF NOT EXISTS matches_ad AFTER DELETE ON matches BEGIN
+                INSERT INTO matches_fts (matches_fts, rowid, title, company, reason, key_strengths, missing_skills)
+                VALUES ('delete', old.id, old.title, old.company, old.reason, old.key_strengths, old.missing_skills);
+            END;
+            CREATE TRIGGER IF NOT EXISTS matches_au AFTER UPDATE ON matches BEGIN
+                INSERT INTO matches_fts (matches_fts, rowid, title, company, reason, key_strengths, missing_skills)
+                VALUES ('delete', old.id, old.title, old.company, old.reason, old.key_strengths, old.missing_skills);
+                INSERT INTO matches_fts (rowid, title, company, reason, key_strengths, missing_skills)
+                VALUES (new.id, new.title, new.company, new.reason, new.key_strengths, new.missing_skills);
+            END;
+            """
+        )
+
+    def record_many(self, pairs, resume_hash: str, source: str):
+        """
+        Record (job, result) pairs in one transaction, skipping throttled and failed evaluations.
+
+        Results served from the match cache were evaluated earlier, so they
+        only fill in a missing row and never move an existing row's
+        `evaluated_at` forward.
+        """
+        now = time.time()
+        fresh, cached = [], []
+        for job, result in pairs:
+            if result.get("throttled") or result.get("error"):
+                continue
+            try:
+                score = int(result.get("match_score"))
+            except (ValueError, TypeError):
+                score = 0
+            (cached if result.get("cached") else fresh).append((
+                job.url, resume_hash, job.title, job.company, score,
+                int(bool(result.get("is_match")) and score >= 50), result.get("reason", ""),
+                _items(result.get("key_strengths")), _items(result.get("missing_skills")), source, now,
+            ))
+        if not fresh and not cached:
+            return
+        insert = """
+            INSERT INTO matches (url, resume_hash, title, company, score, is_match, reason,
+                                 key_strengths, missing_skills, source, evaluated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                # An upsert rather than INSERT OR REPLACE, so the row keeps its id and the update trigger reindexes it
+                self.conn.executemany(
+                    insert + """
+                    ON CONFLICT (url, resume_hash) DO UPDATE SET
+                        title = excluded.title, company = excluded.company, score = excluded.score,
+                        is_match = excluded.is_match, reason = excluded.reason,
+                        key_strengths = excluded.key_strengths, missing_skills = excluded.missing_skills,
+                        source = excluded.source, evaluated_at = excluded.evaluated_at
+                    """,
+                    fresh,
+                )
+                self.conn.executemany(insert + "ON CONFLICT (url, resume_hash) DO NOTHING", cached)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def record(self, job, result: dict, resume_hash: str, source: str):
+        self.record_many([(job, result)], resume_hash, source)
+
+    def _where(self, query: str, min_score: int, max_score: int, since: float | None, until: float | None,
+               matches_only: bool) -> tuple[str, list]:
+        clauses = ["m.score BETWEEN ? AND ?"]
+        params = [min_score, max_score]
+        match = fts_query(query)
+        if match:
+            clauses.append("m.id IN (SELECT rowid FROM matches_fts WHERE matches_fts MATCH ?)")
+            params.append(match)
+        if since is not None:
+            clauses.append("m.evaluated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("m.evaluated_at < ?")
+            params.append(until)
+        if matches_only:
+            clauses.append("m.is_match = 1")
+        return " AND ".join(clauses), params
+
+    def search(self, query: str = "", min_score: int = 0, max_score: int = 100, since: float | None = None,
+               until: float | None = None, matches_only: bool = False, limit: int = 100, offset: int = 0) -> list[HistoryEntry]:
+        """Past results matching every word of `query`, best scores and most recent first"""
+        where, params = self._where(query, min_score, max_score, since, until, matches_only)
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT url, title, company, score, is_match, reason, key_strengths, missing_skills, source, evaluated_at
+                FROM matches m WHERE {where}
+                ORDER BY score DESC, evaluated_at DESC LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            ).fetchall()
+        return [
+            HistoryEntry(
+                url, title, company, score, bool(is_match), reason,
+                key_strengths.splitlines(), missing_skills.splitlines(), source, evaluated_at,
+            )
+            for url, title, company, score, is_match, reason, key_strengths, missing_skills, source, evaluated_at in rows
+        ]
+
+    def count(self, query: str = "", min_score: int = 0, max_score: int = 100, since: float | None = None,
+              until: float | None = None, matches_only: bool = False) -> int:
+        where, params = self._where(query, min_score, max_score, since, until, matches_only)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM matches m WHERE {where}", params).fetchone()[0]
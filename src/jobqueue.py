@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from .cache import open_db
+
+# Analyses still waiting for a worker, or being run by one
+ACTIVE = ("queued", "running")
+
+
+@dataclass
+class QueuedAnalysis:
+    """Status of one submitted analysis, as the app polls it"""
+    id: str
+    status: str
+    stage: str
+    total: int
+    done: int
+    error: str
+    run_id: str
+    resumed: bool
+    skipped: list = field(default_factory=list)
+    ahead: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE
+
+
+class AnalysisQueue:
+    """
+    On-disk queue of analyses submitted by the app and run by `src.worker`.
+
+    The app only submits requests and polls their status and results, so its
+    script runs never wait on scraping or the LLM. Workers claim queued
+    analyses atomically; one whose worker stopped heartbeating for
+    `stale_after` seconds is queued again and resumed from its run journal.
+    A finished analysis drops its request (and any resume PDF in it) right
+    away, and is deleted with its results once older than `retention`.
+    """
+
+    def __init__(self, filename: str = "queue.db", stale_after: float | None = None, retention: float | None = None):
+        self.stale_after = stale_after if stale_after is not None else float(os.getenv("WORKER_STALE_SECONDS", "60"))
+        self.retention = retention if retention is not None else float(os.getenv("WORKER_RETENTION_HOURS", "24")) * 3600
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT '',
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                skipped TEXT NOT NULL DEFAULT '[]',
+                error TEXT NOT NULL DEFAULT '',
+                run_id TEXT NOT NULL DEFAULT '',
+                resumed INTEGER NOT NULL DEFAULT 0,
+                worker TEXT NOT NULL DEFAULT '',
+                submitted_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS analyses_status ON analyses (status, submitted_at);
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                analysis_id TEXT NOT NULL,
+                job TEXT NOT NULL,
+                result TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS analysis_results_analysis ON analysis_results (analysis_id, seq);
+            """
+        )
+        with self._lock:
+            self._prune(time.time())
+
+    def _prune(self, now: float):
+        finished = [analysis_id for (analysis_id,) in self.conn.execute(
+            "SELECT id FROM analyses WHERE status NOT IN ('queued', 'running') AND updated_at < ?", (now - self.retention,)
+        )]
+        for analysis_id in finished:
+            self.conn.execute("DELETE FROM analysis_results WHERE analysis_id = ?", (analysis_id,))
+            self.conn.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+
+    def submit(self, request) -> str:
+        """Queue an AnalysisRequest; returns the id to poll it by"""
+        analysis_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self.conn.execute(
+                "INSERT INTO analyses (id, status, request, submitted_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (analysis_id, request.to_json(), now, now),
+            )
+        return analysis_id
+
+    def claim(self, worker: str):
+        """Take the oldest queued analysis as (id, AnalysisRequest), or None if there is none"""
+        from .analysis import AnalysisRequest
+
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers can't claim the same analysis
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "UPDATE analyses SET status = 'queued', worker = '' WHERE status = 'running' AND updated_at < ?",
+                    (now - self.stale_after,),
+                )
+                row = self.conn.execute(
+                    "SELECT id, request FROM analyses WHERE status = 'queued' ORDER BY submitted_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE analyses SET status = 'running', worker = ?, updated_at = ? WHERE id = ?",
+                        (worker, now, row[0]),
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return None if row is None else (row[0], AnalysisRequest.from_json(row[1]))
+
+    def heartbeat(self, analysis_ids: list[str]) -> list[str]:
+        """Mark running analyses as alive; returns those cancelled meanwhile"""
+        if not analysis_ids:
+            return []
+        marks = ", ".join("?" * len(analysis_ids))
+        with self._lock:
+            self.conn.execute(
+                f"UPDATE analyses SET updated_at = ? WHERE status = 'running' AND id IN ({marks})",
+                (time.time(), *analysis_ids),
+            )
+            return [analysis_id for (analysis_id,) in self.conn.execute(
+                f"SELECT id FROM analyses WHERE status = 'cancelled' AND id IN ({marks})", analysis_ids
+            )]
+
+    def update(self, analysis_id: str, **fields):
+        """Record progress of a running analysis: its stage, total, run_id, resumed flag or skipped jobs"""
+        if "skipped" in fields:
+            fields["skipped"] = json.dumps([(job.model_dump(), similarity) for job, similarity in fields["skipped"]])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self.conn.execute(
+                f"UPDATE analyses SET {assignments}, updated_at = ? WHERE id = ? AND status = 'running'",
+                (*fields.values(), time.time(), analysis_id),
+            )
+
+    def add_results(self, analysis_id: str, pairs):
+        """Append (job, result) pairs of a running analysis in one transaction"""
+        rows = [(analysis_id, json.dumps(job.model_dump()), json.dumps(result)) for job, result in pairs]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany("INSERT INTO analysis_results (analysis_id, job, result) VALUES (?, ?, ?)", rows)
+                self.conn.execute(
+                    "UPDATE analyses SET done = done + ?, updated_at = ? WHERE id = ?",
+                    (len(rows), time.time(), analysis_id),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _end(self, analysis_id: str, status: str, error: str = ""):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE analyses SET status = ?, error = ?, stage = '', request = '', updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (status, error, time.time(), analysis_id),
+            )
+
+    def complete(self, analysis_id: str):
+        self._end(analysis_id, "complete")
+
+    def fail(self, analysis_id: str, error: str):
+        self._end(analysis_id, "failed", error)
+
+    def cancel(self, analysis_id: str):
+        """Cancel a queued or running analysis; a running one stops at its worker's next heartbeat"""
+        self._end(analysis_id, "cancelled")
+
+    def get(self, analysis_id: str) -> QueuedAnalysis | None:
+        from .models import Job
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, status, stage, total, done, error, run_id, resumed, skipped, submitted_at FROM analyses WHERE id = ?",
+                (analysis_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            ahead = self.conn.execute(
+                "SELECT COUNT(*) FROM analyses WHERE status = 'queued' AND submitted_at < ?", (row[9],)
+            ).fetchone()[0]
+        return QueuedAnalysis(
+            *row[:7], bool(row[7]),
+            skipped=[(Job(**job), similarity) for job, similarity in json.loads(row[8])],
+            ahead=ahead if row[1] == "queued" else 0,
+        )
+
+    def results(self, analysis_id: str, after: int = 0) -> list[tuple]:
+        """(seq, job, result) of the results appended after `seq`, oldest first"""
+        from .models import Job
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT seq, job, result FROM analysis_results WHERE analysis_id = ? AND seq > ? ORDER BY seq",
+                (analysis_id, after),
+            ).fetchall()
+        return [(seq, Job(**json.loads(job)), json.loads(result)) for seq, job, result in rows]
@@ -1,41 +1,118 @@
-from langchain_openai import ChatOpenAI
-from langchain.output_parsers import StructuredOutputParser, ResponseSchema
-from langchain.prompts import ChatPromptTemplate
-from typing import Dict
+from contextlib import nullcontext
+from functools import cached_property
+from typing import Dict, List
+import asyncio
+import json
+import logging
+import os
 import re
+from .cache import MatchCache, content_hash
+from .metrics import count, span
+from .prescore import PreScorer
+from .preprocess import PREPROCESS_VERSION, compact_posting, compact_resume, count_tokens
+from .ratelimit import Throttled, retry_after, shared_limiter
+from .singleflight import Abandoned, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Rough size of one structured result, reserved against the tokens-per-minute budget
+COMPLETION_TOKENS_PER_JOB = 350
+
+# Instructions for the structured-output mode. They are static and sent first, followed by the
+# resume, so every request for a resume shares one prompt prefix that the provider can cache. The
+# response schema (src/models.py) carries the field descriptions, so no format instructions are sent.
+SYSTEM_PROMPT = (
+    "You are an expert resume reviewer and job matcher. Evaluate whether the candidate is a good fit for the job "
+    "posting. Identify the candidate's skills, experience, education and qualifications in the resume, then compare "
+    "them to the posting's requirements, considering both hard and soft skills. Write list items as plain, concise "
+    "sentences or phrases without HTML or numbering."
+)
+BATCH_SYSTEM_PROMPT = (
+    "You are an expert resume reviewer and job matcher. Evaluate, separately for each job posting, whether the "
+    "candidate is a good fit. Identify the candidate's skills, experience, education and qualifications in the "
+    "resume, then compare them to each posting's requirements, considering both hard and soft skills, and judge "
+    "every posting on its own merits. Return exactly one evaluation per posting, with its job_id. Write list items "
+    "as plain, concise sentences or phrases without HTML or numbering."
+)
+
+# USD per million prompt / completion tokens, for cost reporting; unlisted (e.g. local) models count as free
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# Identical (resume, posting) evaluations in flight anywhere in the process share one LLM call
+_match_flight = SingleFlight("match")
 
 class JobMatcher:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
+    """
+    Evaluates how well a resume fits job postings with an LLM.
 
-        self.response_schemas = [
-            ResponseSchema(
-                name="is_match",
-                description="Whether the candidate is a good fit for the job (true/false)",
+    With MATCHER_SCREEN_MODEL set, evaluation is tiered: a cheap screening
+    model (optionally behind its own OpenAI-compatible endpoint) scores every
+    posting, and only scores inside the uncertain band escalate to this
+    matcher's model.
+    """
+
+    def __init__(self, cache: MatchCache | None = None, prescorer: PreScorer | None = None, model_name: str | None = None,
+                 base_url: str | None = None, api_key: str | None = None, tier: str | None = None):
+        self.cache = cache if cache is not None else MatchCache()
+        # Clear mismatches can be ruled out locally instead of spending an LLM call on them
+        self.prescorer = prescorer if prescorer is not None else PreScorer()
+        self.model_name = model_name or os.getenv("MATCHER_MODEL", "gpt-4o")
+        self.base_url = base_url
+        self.api_key = api_key
+        # "json_schema" asks the API for schema-constrained output; "text" parses free-form JSON replies
+        self.response_mode = os.getenv("MATCHER_RESPONSE_MODE", "json_schema")
+
+        screen_model = os.getenv("MATCHER_SCREEN_MODEL") if tier is None else None
+        self.tier = tier or ("final" if screen_model else "single")
+        self.escalate_band = (int(os.getenv("MATCHER_ESCALATE_MIN", "40")), int(os.getenv("MATCHER_ESCALATE_MAX", "75")))
+        self.screener = None
+        if screen_model:
+            self.screener = JobMatcher(
+                self.cache, self.prescorer, screen_model,
+                os.getenv("MATCHER_SCREEN_BASE_URL"), os.getenv("MATCHER_SCREEN_API_KEY"), tier="screen",
+            )
+        # OpenAI's per-key budget is shared by every matcher in the process; the screening tier has its own
+        if self.tier == "screen":
+            self.limiter = shared_limiter("LLM_SCREEN", rpm="500", tpm="200000")
+        else:
+            self.limiter = shared_limiter("LLM", rpm="500", tpm="30000")
+
+        # LangChain is only imported when a request is actually sent (see the
+        # cached properties below), so fully cached runs never load it.
+        self.response_fields = [
+            (
+                "is_match",
+                "Whether the candidate is a good fit for the job (true/false)",
             ),
-            ResponseSchema(
-                name="reason",
-                description="Brief explanation of why the candidate is or isn't a good fit",
+            (
+                "reason",
+                "Brief explanation of why the candidate is or isn't a good fit",
             ),
-            ResponseSchema(
-                name="match_score",
-                description="A score from 0-100 representing how well the candidate matches the job requirements",
+            (
+                "match_score",
+                "A score from 0-100 representing how well the candidate matches the job requirements",
             ),
-            ResponseSchema(
-                name="key_strengths",
-                description="List of 2-3 key strengths the candidate has for this position",
+            (
+                "key_strengths",
+                "List of 2-3 key strengths the candidate has for this position",
             ),
-            ResponseSchema(
-                name="missing_skills",
-                description="List of 1-2 important skills or qualifications the candidate is missing (if any)",
+            (
+                "missing_skills",
+                "List of 1-2 important skills or qualifications the candidate is missing (if any)",
             ),
-            ResponseSchema(
-                name="improvement_suggestions",
-                description="List of 1-2 suggestions for how the candidate could improve their qualifications for this role",
+            (
+                "improvement_suggestions",
+                "List of 1-2 suggestions for how the candidate could improve their qualifications for this role",
             ),
         ]
 
-        self.prompt = ChatPromptTemplate.from_template(
+        self.prompt_template = (
             """
             You are an expert resume reviewer and job matcher. Your task is to evaluate if a candidate is a good fit for a job based on their resume and the job posting.
 
@@ -56,49 +133,459 @@ class JobMatcher:
             """
         )
 
-        self.output_parser = StructuredOutputParser.from_response_schemas(
-            self.response_schemas
+        self.batch_size = int(os.getenv("MATCHER_BATCH_SIZE", "5"))
+        self.batch_prompt_template = (
+            """
+            You are an expert resume reviewer and job matcher. Your task is to evaluate, separately for each job posting below, if the candidate is a good fit based on their resume.
+
+            First, carefully analyze the resume to identify the candidate's skills, experience, education, and qualifications.
+            Then, compare these to the requirements in each job posting. Judge every posting on its own merits.
+
+            Consider both hard skills (technical abilities, certifications, etc.) and soft skills (communication, teamwork, etc.).
+
+            Important: For key_strengths, missing_skills, and improvement_suggestions, provide clean, simple text items without HTML tags or special formatting. Each item should be a complete, concise sentence or phrase.
+
+            Resume:
+            {resume}
+
+            Job Postings:
+            {job_postings}
+
+            Respond with a markdown code snippet containing a JSON array with exactly one object per job posting. Each object must have these keys:
+            "job_id": the number of the job posting the object refers to
+            {fields}
+            """
         )
 
+        # Token budgets for the compacted resume and each posting (0 = no limit)
+        self.resume_max_tokens = int(os.getenv("RESUME_MAX_TOKENS", "2000"))
+        self.posting_max_tokens = int(os.getenv("POSTING_MAX_TOKENS", "1500"))
+        self._compacted: Dict[str, str] = {}
+
+        # Changes to the prompts, the schema or the preprocessing invalidate cached results
+        self.prompt_version = content_hash(
+            self.prompt_template
+            + self.batch_prompt_template
+            + json.dumps(self.response_fields)
+            + SYSTEM_PROMPT
+            + BATCH_SYSTEM_PROMPT
+            + self.response_mode
+            + PREPROCESS_VERSION
+        )[:16]
+
+    def _chat_model(self, **options):
+        from langchain_openai import ChatOpenAI
+        endpoint = {key: value for key, value in (("base_url", self.base_url), ("api_key", self.api_key)) if value}
+        # Retries are left to the shared limiter so they respect the rate budget
+        return ChatOpenAI(model=self.model_name, temperature=0, max_retries=0, **endpoint, **options)
+
+    @cached_property
+    def llm(self):
+        return self._chat_model(include_response_headers=True)
+
+    def _structured_llm(self, schema):
+        # Response headers aren't available for schema-constrained requests, so the limiter runs on its own estimates
+        return self._chat_model().with_structured_output(schema, method="json_schema", include_raw=True)
+
+    @cached_property
+    def structured_llm(self):
+        from .models import MatchEvaluation
+        return self._structured_llm(MatchEvaluation)
+
+    @cached_property
+    def batch_structured_llm(self):
+        from .models import JobEvaluations
+        return self._structured_llm(JobEvaluations)
+
+    @cached_property
+    def response_schemas(self):
+        from langchain.output_parsers import ResponseSchema
+        return [ResponseSchema(name=name, description=description) for name, description in self.response_fields]
+
+    @cached_property
+    def output_parser(self):
+        from langchain.output_parsers import StructuredOutputParser
+        return StructuredOutputParser.from_response_schemas(self.response_schemas)
+
+    @cached_property
+    def prompt(self):
+        from langchain.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_template(self.prompt_template)
+
+    @cached_property
+    def batch_prompt(self):
+        from langchain.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_template(self.batch_prompt_template)
+
+    def compact_resume(self, resume: str) -> str:
+        """Compacted resume text, computed once per distinct resume"""
+        key = content_hash(resume)
+        if key not in self._compacted:
+            self._compacted[key] = compact_resume(resume, self.resume_max_tokens)
+        return self._compacted[key]
+
+    def compact_posting(self, job_posting: str) -> str:
+        return compact_posting(job_posting, self.posting_max_tokens)
+
+    async def _ainvoke(self, prompt, jobs: int = 1, runnable=None):
+        """
+        Send a prompt (a string or a list of messages) within the shared rate
+        budget, retrying throttled requests.
+
+        With a structured-output `runnable`, the response is its
+        {"raw", "parsed", "parsing_error"} dict rather than a message.
+        """
+        import openai
+
+        runnable = runnable or self.llm
+        text = prompt if isinstance(prompt, str) else "\n".join(content for _, content in prompt)
+        estimate = count_tokens(text) + COMPLETION_TOKENS_PER_JOB * jobs
+
+        async def attempt():
+            try:
+                tier_span = span(f"llm_{self.tier}") if self.tier != "single" else nullcontext()
+                with span("llm_call", model=self.model_name, jobs=jobs), tier_span:
+                    response = await runnable.ainvoke(prompt)
+            except openai.RateLimitError as e:
+                self.limiter.observe(e.response.headers)
+                if e.code == "insufficient_quota":
+                    raise
+                raise Throttled(str(e), retry_after(e.response.headers)) from e
+            except openai.InternalServerError as e:
+                raise Throttled(str(e), retry_after(e.response.headers)) from e
+            except openai.APIConnectionError as e:
+                raise Throttled(str(e)) from e
+            message = response["raw"] if isinstance(response, dict) else response
+            self.limiter.observe(message.response_metadata.get("headers"))
+            return response
+
+        response = await self.limiter.call(attempt, estimate)
+        usage = (response["raw"] if isinstance(response, dict) else response).usage_metadata
+        if usage:
+            self.limiter.settle(estimate, usage["total_tokens"])
+            count("llm_tokens", usage["input_tokens"], kind="prompt", tier=self.tier)
+            count("llm_tokens", usage["output_tokens"], kind="completion", tier=self.tier)
+            prompt_price, completion_price = MODEL_PRICES.get(self.model_name, (0.0, 0.0))
+            cost = (usage["input_tokens"] * prompt_price + usage["output_tokens"] * completion_price) / 1_000_000
+            count("llm_cost_usd", cost, tier=self.tier)
+        return response
+
+    async def _invoke_structured(self, messages: list, jobs: int, runnable):
+        """The validated structured response, or None when the reply didn't follow the schema"""
+        import openai
+        try:
+            response = await self._ainvoke(messages, jobs, runnable)
+        except openai.BadRequestError as e:
+            if "response_format" not in str(e) and "json_schema" not in str(e):
+                raise
+            logger.warning(f"{self.model_name} rejected structured output, falling back to text parsing: {str(e)}")
+            self.response_mode = "text"
+            return None
+        if response["parsed"] is None:
+            count("structured_fallbacks")
+        return response["parsed"]
+
+    @staticmethod
+    def _evaluation_result(evaluation) -> Dict:
+        """A schema-validated evaluation in the matcher's result format"""
+        result = evaluation.model_dump(exclude={"job_id"})
+        result["match_score"] = str(min(max(result["match_score"], 0), 100))
+        for key in ("key_strengths", "missing_skills", "improvement_suggestions"):
+            result[key] = [item.strip() for item in result[key] if item.strip()] or ["N/A"]
+        return result
+
+    def _clean_result(self, result: Dict) -> Dict:
+        if "improvement_suggestions" not in result:
+            result["improvement_suggestions"] = ["N/A"]
+
+        for key in ["key_strengths", "missing_skills", "improvement_suggestions"]:
+            if key in result and isinstance(result[key], list):
+                if len(result[key]) == 1 and isinstance(result[key][0], str) and re.search(r'\d+\.', result[key][0]):
+                    items = re.split(r'\s*\d+\.\s*', result[key][0])
+                    result[key] = [item.strip() for item in items if item.strip()]
+
+                result[key] = [re.sub(r'<[^>]+>', '', item) if isinstance(item, str) else item for item in result[key]]
+
+        return result
+
+    @staticmethod
+    def _unreadable_resume() -> Dict:
+        return {
+            "is_match": False,
+            "reason": "Unable to extract content from the resume. Please try a different format or input method.",
+            "match_score": "0",
+            "key_strengths": ["N/A"],
+            "missing_skills": ["N/A"],
+            "improvement_suggestions": ["Try using the text input option"]
+        }
+
     async def evaluate_match(self, resume: str, job_posting: str) -> Dict:
+        if self.screener is None:
+            return await self._evaluate_match(resume, job_posting)
+        screened = await self.screener.evaluate_match(resume, job_posting)
+        return (await self._escalate(resume, [job_posting], [screened]))[0]
+
+    async def evaluate_batch(self, resume: str, job_postings: List[str], batch_size: int | None = None) -> List[Dict]:
+        """
+        Evaluate several job postings against one copy of the resume, in order.
+
+        When tiered, the screening model scores them all first and only the
+        uncertain ones are evaluated again by this matcher's model. Raises
+        Throttled if the API is still rate limiting after every retry.
+        """
+        if self.screener is None:
+            return await self._evaluate_batch(resume, job_postings, batch_size)
+        screened = await self.screener.evaluate_batch(resume, job_postings, batch_size)
+        return await self._escalate(resume, job_postings, screened, batch_size)
+
+    def _uncertain(self, result: Dict) -> bool:
+        """Whether a screening result needs the stronger model: in the uncertain band, or failed"""
+        if result.get("prescored"):
+            return False
+        # A failing screening model (bad name, a 4xx, an unparsable reply) must not turn every posting into a 0
+        if result.get("error"):
+            return True
+        try:
+            score = int(result.get("match_score"))
+        except (ValueError, TypeError):
+            return True
+        low, high = self.escalate_band
+        return low <= score <= high
+
+    async def _escalate(self, resume: str, job_postings: List[str], screened: List[Dict], batch_size: int | None = None) -> List[Dict]:
+        results = [{**result, "tier": "screen"} for result in screened]
+        # Only fresh model calls count: a rerun served from the match cache screens and escalates nothing
+        count("screened", sum(1 for result in screened if not (result.get("cached") or result.get("prescored"))))
+        uncertain = [index for index, result in enumerate(screened) if self._uncertain(result)]
+        if not uncertain:
+            return results
+        final = await self._evaluate_batch(resume, [job_postings[index] for index in uncertain], batch_size)
+        count("escalations", sum(1 for result in final if not result.get("cached")))
+        for index, result in zip(uncertain, final):
+            # A failed escalation keeps the screening verdict rather than becoming a score of 0
+            if not result.get("error") or screened[index].get("error"):
+                results[index] = {**result, "tier": "final", "screen_score": screened[index].get("match_score")}
+        return results
+
+    async def _evaluate_match(self, resume: str, job_posting: str) -> Dict:
         try:
             if not resume or resume.startswith("Error processing PDF"):
-                return {
-                    "is_match": False,
-                    "reason": "Unable to extract content from the resume. Please try a different format or input method.",
-                    "match_score": "0",
-                    "key_strengths": ["N/A"],
-                    "missing_skills": ["N/A"],
-                    "improvement_suggestions": ["Try using the text input option"]
-                }
+                return self._unreadable_resume()
+
+            cache_key = MatchCache.key(resume, job_posting, self.model_name, self.prompt_version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                count("cache_hits", cache="match")
+                return {**cached, "cached": True}
+            count("cache_misses", cache="match")
+
+            ruled_out = self.prescorer.rule_out(resume, [job_posting])[0]
+            if ruled_out is not None:
+                return {**ruled_out, "cached": False}
+
+            result = await _match_flight.do(cache_key, lambda: self._evaluate(resume, job_posting, cache_key))
+            return {**result, "cached": False}
+        except Throttled:
+            # Still rate limited after every retry: not a verdict on the job
+            raise
+        except Exception as e:
+            return self._failed_result(e)
+
+    @staticmethod
+    def _failed_result(error: Exception) -> Dict:
+        return {
+            "is_match": False,
+            "reason": f"Unable to evaluate match: {str(error)}",
+            "match_score": "0",
+            "key_strengths": ["N/A"],
+            "missing_skills": ["N/A"],
+            "improvement_suggestions": ["N/A"],
+            "error": True
+        }
+
+    async def _evaluate(self, resume: str, job_posting: str, cache_key: str) -> Dict:
+        """One uncached LLM evaluation; errors propagate to the caller"""
+        compacted = self.compact_resume(resume)
+        if not compacted:
+            return self._unreadable_resume()
 
+        posting = self.compact_posting(job_posting)
+        result = None
+        if self.response_mode == "json_schema":
+            evaluation = await self._invoke_structured(
+                [("system", SYSTEM_PROMPT), ("human", f"Resume:\n{compacted}\n\nJob Posting:\n{posting}")],
+                1,
+                self.structured_llm,
+            )
+            if evaluation is not None:
+                result = self._evaluation_result(evaluation)
+
+        if result is None:
             formatted_prompt = self.prompt.format(
-                resume=resume,
-                job_posting=job_posting,
+                resume=compacted,
+                job_posting=posting,
                 format_instructions=self.output_parser.get_format_instructions(),
             )
+            response = await self._ainvoke(formatted_prompt)
+            with span("postprocess"):
+                result = self._clean_result(self.output_parser.parse(response.content))
+
+        self.cache.put(cache_key, result)
+        return result
+
+    async def _evaluate_single(self, resume: str, job_posting: str, cache_key: str) -> Dict:
+        """Fallback for a posting whose coalesced call this matcher already owns"""
+        try:
+            return {**await self._evaluate(resume, job_posting, cache_key), "cached": False}
+        except Throttled:
+            raise
+        except Exception as e:
+            return self._failed_result(e)
 
-            response = await self.llm.ainvoke(formatted_prompt)
-            result = self.output_parser.parse(response.content)
+    async def _follow(self, resume: str, job_posting: str, future) -> Dict:
+        """Await an identical evaluation that is already in flight"""
+        try:
+            return {**await _match_flight.wait(future), "cached": False}
+        except Abandoned:
+            return await self._evaluate_match(resume, job_posting)
+        except Throttled:
+            raise
+        except Exception as e:
+            return self._failed_result(e)
 
-            if "improvement_suggestions" not in result:
-                result["improvement_suggestions"] = ["N/A"]
+    async def _evaluate_batch(self, resume: str, job_postings: List[str], batch_size: int | None = None) -> List[Dict]:
+        """
+        Evaluate several job postings against one copy of the resume with this matcher's model.
 
-            for key in ["key_strengths", "missing_skills", "improvement_suggestions"]:
-                if key in result and isinstance(result[key], list):
-                    if len(result[key]) == 1 and isinstance(result[key][0], str) and re.search(r'\d+\.', result[key][0]):
-                        items = re.split(r'\s*\d+\.\s*', result[key][0])
-                        result[key] = [item.strip() for item in items if item.strip()]
+        Postings are sent `batch_size` at a time; any posting whose entry in a
+        batch response is missing or malformed is retried on its own. Postings
+        already being evaluated against this resume elsewhere in the process
+        await that call instead. Results are returned in the order of
+        `job_postings`. Raises Throttled if the API is still rate limiting after
+        every retry.
+        """
+        batch_size = batch_size or self.batch_size
+        if batch_size <= 1 or not resume or resume.startswith("Error processing PDF") or not self.compact_resume(resume):
+            return list(await asyncio.gather(*(self._evaluate_match(resume, posting) for posting in job_postings)))
 
-                    result[key] = [re.sub(r'<[^>]+>', '', item) if isinstance(item, str) else item for item in result[key]]
+        results: List[Dict | None] = [None] * len(job_postings)
+        uncached = []
+        for index, posting in enumerate(job_postings):
+            cache_key = MatchCache.key(resume, posting, self.model_name, self.prompt_version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                count("cache_hits", cache="match")
+                results[index] = {**cached, "cached": True}
+                continue
+            count("cache_misses", cache="match")
+            uncached.append((index, posting, cache_key))
 
-            return result
-        except Exception as e:
-            return {
-                "is_match": False,
-                "reason": f"Unable to evaluate match: {str(e)}",
-                "match_score": "0",
-                "key_strengths": ["N/A"],
-                "missing_skills": ["N/A"],
-                "improvement_suggestions": ["N/A"]
-            }
\ No newline at end of file
+        ruled_out = self.prescorer.rule_out(resume, [posting for _, posting, _ in uncached])
+        pending = []
+        followers = []
+        claims = {}
+        for (index, posting, cache_key), local in zip(uncached, ruled_out):
+            if local is not None:
+                results[index] = {**local, "cached": False}
+                continue
+            future, leader = _match_flight.claim(cache_key)
+            if leader:
+                claims[cache_key] = future
+                pending.append((index, posting, cache_key))
+            else:
+                followers.append((index, posting, future))
+
+        async def run_chunk(chunk):
+            keys = {index: cache_key for index, _, cache_key in chunk}
+            try:
+                chunk_results = await self._evaluate_chunk(resume, chunk)
+            except BaseException as e:
+                for cache_key in keys.values():
+                    _match_flight.settle(cache_key, claims[cache_key], error=e)
+                raise
+            for index, result in chunk_results:
+                _match_flight.settle(keys[index], claims[keys[index]], result)
+            return chunk_results
+
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        chunk_results, follower_results = await asyncio.gather(
+            asyncio.gather(*(run_chunk(chunk) for chunk in chunks)),
+            asyncio.gather(*(self._follow(resume, posting, future) for _, posting, future in followers)),
+        )
+        for chunk_result in chunk_results:
+            for index, result in chunk_result:
+                results[index] = result
+        for (index, _, _), result in zip(followers, follower_results):
+            results[index] = result
+        return results
+
+    async def _evaluate_chunk(self, resume: str, chunk: list) -> list:
+        parsed = {}
+        structured = False
+        try:
+            compacted = self.compact_resume(resume)
+            job_postings = "\n\n".join(
+                f"### Job {job_id}\n{self.compact_posting(posting)}" for job_id, (_, posting, _) in enumerate(chunk, start=1)
+            )
+            if self.response_mode == "json_schema":
+                evaluations = await self._invoke_structured(
+                    [("system", BATCH_SYSTEM_PROMPT), ("human", f"Resume:\n{compacted}\n\nJob Postings:\n{job_postings}")],
+                    len(chunk),
+                    self.batch_structured_llm,
+                )
+                if evaluations is not None:
+                    structured = True
+                    parsed = {evaluation.job_id: self._evaluation_result(evaluation) for evaluation in evaluations.results}
+            # Also reached when the model just rejected structured output
+            if self.response_mode == "text":
+                formatted_prompt = self.batch_prompt.format(
+                    resume=compacted,
+                    job_postings=job_postings,
+                    fields="\n".join(f'"{name}": {description}' for name, description in self.response_fields),
+                )
+                response = await self._ainvoke(formatted_prompt, len(chunk))
+                with span("postprocess"):
+                    parsed = self._parse_batch(response.content)
+        except Throttled:
+            raise
+        except Exception:
+            parsed = {}
+
+        results = []
+        fallbacks = []
+        required = {name for name, _ in self.response_fields} - {"improvement_suggestions"}
+        for job_id, (index, posting, cache_key) in enumerate(chunk, start=1):
+            result = parsed.get(job_id)
+            if isinstance(result, dict) and required <= result.keys():
+                if not structured:
+                    with span("postprocess"):
+                        result = self._clean_result(result)
+                self.cache.put(cache_key, result)
+                results.append((index, {**result, "cached": False}))
+            else:
+                fallbacks.append((index, posting, cache_key))
+
+        if fallbacks:
+            count("batch_fallbacks", len(fallbacks))
+        fallback_results = await asyncio.gather(
+            *(self._evaluate_single(resume, posting, cache_key) for _, posting, cache_key in fallbacks)
+        )
+        results.extend(zip((index for index, _, _ in fallbacks), fallback_results))
+        return results
+
+    @staticmethod
+    def _parse_batch(text: str) -> Dict[int, Dict]:
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        data = json.loads(fenced.group(1) if fenced else text)
+        if isinstance(data, dict):
+            data = next((value for value in data.values() if isinstance(value, list)), [])
+        parsed = {}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            try:
+                job_id = int(item.pop("job_id"))
+            except (KeyError, ValueError, TypeError):
+                continue
+            parsed[job_id] = item
+        return parsed
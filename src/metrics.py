@@ -0,0 +1,253 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+# Stages grouped by the resource they wait on, for the "what bound this run" verdict
+SCRAPING_STAGES = ("scrape_job_postings", "scrape_job_content", "resume_parse")
+LLM_STAGES = ("llm_call",)
+
+
+def _labels(labels: dict) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+class Metrics:
+    """
+    Thread-safe recorder of stage timings and counters.
+
+    Durations keep a bounded sample per stage for percentiles; with
+    `keep_intervals` the start/end of every span is kept too, so overlapping
+    concurrent spans can be merged into the wall-clock time a stage was busy.
+    """
+
+    def __init__(self, sample_size: int = 1024, keep_intervals: bool = False):
+        self.started = time.time()
+        self.sample_size = sample_size
+        self.keep_intervals = keep_intervals
+        self.durations = defaultdict(lambda: deque(maxlen=self.sample_size))
+        self.totals = defaultdict(lambda: [0, 0.0, 0.0])  # count, sum, max
+        self.intervals = defaultdict(list)
+        self.counters = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, start: float, seconds: float):
+        with self._lock:
+            self.durations[stage].append(seconds)
+            totals = self.totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            if self.keep_intervals:
+                self.intervals[stage].append((start, start + seconds))
+
+    def count(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self.counters[(name, _labels(labels))] += value
+
+    def counter(self, name: str, **labels) -> float:
+        """Sum of `name` over every label set matching `labels`"""
+        with self._lock:
+            return sum(
+                value for (key, label_text), value in self.counters.items()
+                if key == name and all(f'{k}="{v}"' in label_text for k, v in labels.items())
+            )
+
+    def busy(self, stages) -> float:
+        """Wall-clock seconds during which any span of `stages` was running"""
+        with self._lock:
+            intervals = sorted(interval for stage in stages for interval in self.intervals.get(stage, []))
+        busy = 0.0
+        end = float("-inf")
+        for start, stop in intervals:
+            if start > end:
+                busy += stop - start
+                end = stop
+            elif stop > end:
+                busy += stop - end
+                end = stop
+        return busy
+
+    def stages(self) -> list[dict]:
+        """Per-stage count, total, mean, p50, p95 and max, slowest total first"""
+        with self._lock:
+            rows = []
+            for stage, (count, total, longest) in self.totals.items():
+                sample = sorted(self.durations[stage])
+                rows.append({
+                    "stage": stage,
+                    "count": count,
+                    "total_s": round(total, 3),
+                    "mean_s": round(total / count, 3),
+                    "p50_s": round(sample[len(sample) // 2], 3),
+                    "p95_s": round(sample[min(len(sample) - 1, int(len(sample) * 0.95))], 3),
+                    "max_s": round(longest, 3),
+                })
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def hit_rate(self, cache: str) -> float | None:
+        hits = self.counter("cache_hits", cache=cache)
+        misses = self.counter("cache_misses", cache=cache)
+        return hits / (hits + misses) if hits + misses else None
+
+    def bound(self) -> str | None:
+        """Whether scraping or the LLM kept the run busy for longer"""
+        scraping, llm = self.busy(SCRAPING_STAGES), self.busy(LLM_STAGES)
+        if not scraping and not llm:
+            return None
+        return "scraping" if scraping >= llm else "LLM"
+
+    def summary(self) -> str:
+        parts = [f"{row['stage']} {row['count']}x {row['total_s']:.1f}s (p95 {row['p95_s']:.2f}s)" for row in self.stages()]
+        for cache in ("source", "page", "match", "resume"):
+            rate = self.hit_rate(cache)
+            if rate is not None:
+                parts.append(f"{cache} cache {rate:.0%} hits")
+        tokens = self.counter("llm_tokens")
+        if tokens:
+            parts.append(f"{tokens:.0f} LLM tokens")
+        retries = self.counter("retries")
+        if retries:
+            parts.append(f"{retries:.0f} retries")
+        coalesced = self.counter("coalesced")
+        if coalesced:
+            parts.append(f"{coalesced:.0f} coalesced")
+        screened = self.counter("screened")
+        if screened:
+            parts.append(f"{self.counter('escalations'):.0f}/{screened:.0f} escalated")
+        cost = self.counter("llm_cost_usd")
+        if cost:
+            parts.append(f"${cost:.4f} LLM cost")
+        avoided = self.counter("llm_calls_avoided")
+        if avoided:
+            parts.append(f"{avoided:.0f} LLM calls avoided")
+        bound = self.bound()
+        if bound:
+            parts.append(f"{bound}-bound")
+        return ", ".join(parts)
+
+    def prometheus(self, prefix: str = "jobsearch") -> str:
+        """Prometheus text exposition of every stage and counter"""
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for row in self.stages():
+            stage = f'stage="{row["stage"]}"'
+            lines.append(f'{prefix}_stage_seconds{{{stage},quantile="0.5"}} {row["p50_s"]}')
+            lines.append(f'{prefix}_stage_seconds{{{stage},quantile="0.95"}} {row["p95_s"]}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{stage}}} {row['total_s']}")
+            lines.append(f"{prefix}_stage_seconds_count{{{stage}}} {row['count']}")
+        with self._lock:
+            counters = sorted(self.counters.items())
+        typed = set()
+        for (name, label_text), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                typed.add(name)
+            lines.append(f"{prefix}_{name}_total{{{label_text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide totals, plus an optional per-run recorder bound to the current context
+metrics = Metrics()
+_run: ContextVar[Metrics | None] = ContextVar("run_metrics", default=None)
+_trace = None
+_trace_lock = threading.Lock()
+
+
+def _recorders() -> list[Metrics]:
+    run = _run.get()
+    return [metrics] if run is None else [metrics, run]
+
+
+def collect() -> Metrics:
+    """
+    Also record everything timed from here on into a fresh Metrics.
+
+    The recorder is bound to the current context, so it covers the tasks
+    started from it and nothing in other sessions or event loops.
+    """
+    run = Metrics(keep_intervals=True)
+    _run.set(run)
+    return run
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """Time the enclosed block as one occurrence of `stage`"""
+    start = time.time()
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - began
+        for recorder in _recorders():
+            recorder.observe(stage, start, seconds)
+        if _trace is not None:
+            record = json.dumps({"ts": round(start, 6), "stage": stage, "seconds": round(seconds, 6), **attrs})
+            with _trace_lock:
+                _trace.write(record + "\n")
+                _trace.flush()
+
+
+def timed(stage: str):
+    """Decorator timing every call of a coroutine function as `stage`"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1, **labels):
+    for recorder in _recorders():
+        recorder.count(name, value, **labels)
+
+
+def start_trace(path: str):
+    """Append every finished span to `path` as one JSON line"""
+    global _trace
+    with _trace_lock:
+        _trace = open(path, "a", encoding="utf-8")
+
+
+def serve(port: int, host: str = "127.0.0.1"):
+    """Expose the process-wide metrics at http://host:port/metrics from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    logger.info(f"Serving metrics at http://{host}:{port}/metrics")
+    return server
+
+
+def configure_from_env():
+    """Start the exporters requested by METRICS_TRACE_FILE and METRICS_PORT"""
+    trace_file = os.getenv("METRICS_TRACE_FILE")
+    if trace_file:
+        start_trace(trace_file)
+    port = int(os.getenv("METRICS_PORT", "0"))
+    if port:
+        serve(port, os.getenv("METRICS_HOST", "127.0.0.1"))
@@ -11,3 +11,21 @@ class Job(BaseModel):
 
 class JobListings(BaseModel):
     jobs: List[Job] = Field(description="List of job postings")
+
+
+class MatchEvaluation(BaseModel):
+    """Structured-output schema of one evaluation; field descriptions double as instructions"""
+    is_match: bool = Field(description="Whether the candidate is a good fit for the job")
+    reason: str = Field(description="Brief explanation of why the candidate is or isn't a good fit")
+    match_score: int = Field(description="A score from 0-100 representing how well the candidate matches the job requirements")
+    key_strengths: List[str] = Field(description="2-3 key strengths the candidate has for this position")
+    missing_skills: List[str] = Field(description="1-2 important skills or qualifications the candidate is missing (if any)")
+    improvement_suggestions: List[str] = Field(description="1-2 suggestions for how the candidate could improve their qualifications for this role")
+
+
+class JobEvaluation(MatchEvaluation):
+    job_id: int = Field(description="The number of the job posting this evaluation refers to")
+
+
+class JobEvaluations(BaseModel):
+    results: List[JobEvaluation] = Field(description="Exactly one evaluation per job posting")
@@ -0,0 +1,114 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from .metrics import span
+
+if TYPE_CHECKING:
+    import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOP_WORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being but by can could did do does
+    for from had has have having he her here hers him his how i if in into is it its itself just
+    me more most my no nor not now of off on once only or other our ours out over own same she
+    should so some such than that the their theirs them then there these they this those through
+    to too under until up very was we were what when where which while who whom why will with
+    would you your yours job jobs role work team company experience years year including etc
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS and len(token) > 1]
+
+
+class JobPreFilter:
+    """
+    Cheap TF-IDF ranking of job postings against a resume.
+
+    Only postings within the `top_k` most similar (0 = no limit) and scoring at
+    least `threshold` cosine similarity are forwarded to the LLM matcher.
+    The limit applies per call to `select`: the app ranks a whole analysis at
+    once, the scheduler each source page's batch.
+    """
+
+    def __init__(self, top_k: int | None = None, threshold: float | None = None):
+        self.top_k = top_k if top_k is not None else int(os.getenv("PREFILTER_TOP_K", "0"))
+        self.threshold = threshold if threshold is not None else float(os.getenv("PREFILTER_THRESHOLD", "0"))
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_k > 0 or self.threshold > 0
+
+    @property
+    def settings(self) -> str:
+        """Identity of the selection rules, recorded with the postings they skipped"""
+        return f"top_k={self.top_k},threshold={self.threshold:g}"
+
+    def score(self, resume: str, documents: list[str]) -> "np.ndarray":
+        """Cosine similarity of every document to the resume"""
+        import numpy as np
+
+        if not documents:
+            return np.zeros(0, dtype=np.float32)
+
+        doc_counts = [Counter(tokenize(doc)) for doc in documents]
+        resume_counts = Counter(tokenize(resume))
+
+        n_docs = len(documents) + 1
+        df = Counter(resume_counts.keys())
+        for counts in doc_counts:
+            df.update(counts.keys())
+        idf = {term: math.log((1 + n_docs) / (1 + freq)) + 1 for term, freq in df.items()}
+
+        # Only resume terms contribute to the dot product, so the matrix is
+        # n_docs x |resume vocabulary| while norms use every document term.
+        vocab = {term: i for i, term in enumerate(resume_counts)}
+        query = np.zeros(len(vocab), dtype=np.float32)
+        for term, count in resume_counts.items():
+            query[vocab[term]] = (1 + math.log(count)) * idf[term]
+
+        matrix = np.zeros((len(documents), len(vocab)), dtype=np.float32)
+        norms = np.zeros(len(documents), dtype=np.float32)
+        for row, counts in enumerate(doc_counts):
+            weights = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+            norms[row] = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for term, weight in weights.items():
+                column = vocab.get(term)
+                if column is not None:
+                    matrix[row, column] = weight
+
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return np.zeros(len(documents), dtype=np.float32)
+        norms[norms == 0] = 1.0
+        return (matrix @ query) / (norms * query_norm)
+
+    def select(self, resume: str, items: list, documents: list[str]) -> tuple[list, list]:
+        """
+        Split `items` into those forwarded to the LLM and those skipped.
+
+        Returns two lists of (item, similarity) pairs, each ordered by similarity.
+        When the filter is disabled every item is forwarded unscored.
+        """
+        if not self.enabled:
+            return [(item, 0.0) for item in items], []
+
+        import numpy as np
+
+        with span("prefilter"):
+            scores = self.score(resume, documents)
+        order = np.argsort(-scores, kind="stable")
+        selected, skipped = [], []
+        for rank, index in enumerate(order):
+            pair = (items[index], float(scores[index]))
+            if (self.top_k <= 0 or rank < self.top_k) and scores[index] >= self.threshold:
+                selected.append(pair)
+            else:
+                skipped.append(pair)
+        return selected, skipped
@@ -0,0 +1,178 @@
+import re
+from functools import lru_cache
+
+# Bump when the compaction rules change so cached match results are re-evaluated
+PREPROCESS_VERSION = "2"
+
+SECTION_HEADINGS = {
+    "summary": "Summary",
+    "profile": "Summary",
+    "professional summary": "Summary",
+    "objective": "Summary",
+    "about me": "Summary",
+    "skills": "Skills",
+    "technical skills": "Skills",
+    "core competencies": "Skills",
+    "experience": "Experience",
+    "work experience": "Experience",
+    "professional experience": "Experience",
+    "employment history": "Experience",
+    "education": "Education",
+    "projects": "Projects",
+    "certifications": "Certifications",
+    "certificates": "Certifications",
+    "publications": "Publications",
+    "awards": "Awards",
+    "languages": "Languages",
+    "volunteering": "Volunteering",
+    "interests": "Interests",
+}
+
+# When a resume is over budget, sections are kept in this order
+SECTION_PRIORITY = ["Skills", "Experience", "Summary", "Education", "Certifications", "Projects"]
+
+PDF_NOISE = [
+    re.compile(r"^\s*page \d+( of \d+)?\s*$", re.IGNORECASE),
+    re.compile(r"^\s*(RESUME: .*|NOTE: No text could be extracted.*|Please try using the Text Input option.*)$"),
+]
+
+POSTING_BOILERPLATE = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r"equal opportunity employer",
+        r"without regard to (race|age|sex|gender)",
+        r"reasonable accommodation",
+        r"\b(uses?|accept|reject|allow|manage|necessary|essential|analytics|marketing)( all| our)? cookies\b",
+        r"^cookies?( (settings|preferences|policy|notice|consent))?\W*$",
+        r"privacy (policy|notice)",
+        r"^(apply( now)?|share( this job)?|save( job)?|back to (jobs|search)|sign in|log in|menu|skip to (main )?content)\W*$",
+        r"^(all rights reserved|©|copyright)",
+        r"^(follow us|join our talent (network|community))",
+    ]
+]
+
+MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+BARE_URL = re.compile(r"https?://\S+")
+# A line holding just a small number, as PDF page footers do; years and the like have more digits
+BARE_NUMBER = re.compile(r"^\d{1,3}$")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken is optional and fetches its vocabulary on first use
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0 or count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _clean_lines(text: str, noise: list[re.Pattern]) -> list[str]:
+    # Re-join words hyphenated across PDF line breaks and drop control characters
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"[\x00-\x08\x0b-\x1f\x7f​﻿]", " ", text)
+
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip(" \t•·▪●-*|")
+        if not line or any(pattern.search(line) for pattern in noise):
+            continue
+        # Only back-to-back repeats are dropped: the same title or bullet under two jobs is kept
+        if lines and line.lower() == lines[-1].lower():
+            continue
+        lines.append(line)
+    return lines
+
+
+def _drop_page_numbers(lines: list[str]) -> list[str]:
+    """Drop bare numbers that count up page by page (1, 2, 3...), keeping any other lone number"""
+    kept = []
+    page = 0
+    for line in lines:
+        if BARE_NUMBER.match(line) and int(line) in (page + 1, page + 2):
+            page = int(line)
+            continue
+        kept.append(line)
+    return kept
+
+
+def _heading(line: str) -> str | None:
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    if key in SECTION_HEADINGS:
+        return SECTION_HEADINGS[key]
+    return None
+
+
+def compact_resume(text: str, max_tokens: int = 0) -> str:
+    """
+    Normalize raw resume text into a compact, sectioned form.
+
+    Removes PDF extraction noise (page numbers, hyphenation, the PDFProcessor
+    fallback note), repeated lines and whitespace, groups lines under
+    canonical section headings, and fits the result into `max_tokens` by
+    dropping the least important sections and lines first.
+    """
+    sections = {}
+    current = "Header"
+    for line in _drop_page_numbers(_clean_lines(text, PDF_NOISE)):
+        heading = _heading(line)
+        if heading:
+            current = heading
+            continue
+        sections.setdefault(current, []).append(line)
+
+    def render(keep):
+        parts = []
+        for name, lines in sections.items():
+            kept = lines[: keep.get(name, 0)]
+            if kept:
+                parts.append("\n".join(kept) if name == "Header" else f"## {name}\n" + "\n".join(kept))
+        return "\n\n".join(parts)
+
+    keep = {name: len(lines) for name, lines in sections.items()}
+    compact = render(keep)
+    if max_tokens <= 0 or count_tokens(compact) <= max_tokens:
+        return compact
+
+    # Fill the budget section by section in priority order, line by line
+    order = ["Header"] + SECTION_PRIORITY + [name for name in sections if name not in SECTION_PRIORITY and name != "Header"]
+    keep = {name: 0 for name in sections}
+    for name in order:
+        for count in range(1, len(sections.get(name, [])) + 1):
+            keep[name] = count
+            if count_tokens(render(keep)) > max_tokens:
+                keep[name] = count - 1
+                return truncate_to_tokens(render(keep), max_tokens)
+    return render(keep)
+
+
+def compact_posting(text: str, max_tokens: int = 0) -> str:
+    """
+    Strip a scraped job posting down to its content.
+
+    Removes images, link targets, bare URLs, navigation and legal boilerplate
+    and repeated lines, then truncates to `max_tokens`.
+    """
+    text = MARKDOWN_IMAGE.sub("", text)
+    text = MARKDOWN_LINK.sub(r"\1", text)
+    text = BARE_URL.sub("", text)
+    compact = "\n".join(_clean_lines(text, POSTING_BOILERPLATE))
+    return truncate_to_tokens(compact, max_tokens)
@@ -0,0 +1,243 @@
+import os
+import re
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+
+from .cache import content_hash
+from .metrics import count, span
+
+# Canonical skill -> aliases matched in free text. Ambiguous words ("go", "r",
+# "rest", "node") are left out: a false required skill would wrongly rule a posting out.
+SKILLS = {
+    "python": ["python"], "java": ["java"], "javascript": ["javascript", "js"], "typescript": ["typescript"],
+    "go": ["golang"], "rust": ["rust"], "c++": ["c++", "cpp"], "c#": ["c#", "csharp"], "ruby": ["ruby"],
+    "php": ["php"], "scala": ["scala"], "kotlin": ["kotlin"], "swift": ["swift"],
+    "sql": ["sql"], "postgresql": ["postgresql", "postgres"], "mysql": ["mysql"], "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"], "elasticsearch": ["elasticsearch", "opensearch"], "kafka": ["kafka"], "spark": ["spark", "pyspark"],
+    "airflow": ["airflow"], "dbt": ["dbt"], "snowflake": ["snowflake"], "bigquery": ["bigquery"],
+    "aws": ["aws", "amazon web services"], "gcp": ["gcp", "google cloud"], "azure": ["azure"],
+    "docker": ["docker"], "kubernetes": ["kubernetes", "k8s"], "terraform": ["terraform"], "ansible": ["ansible"],
+    "linux": ["linux"], "ci/cd": ["ci/cd", "continuous integration"], "git": ["git"],
+    "react": ["react", "react.js", "reactjs"], "angular": ["angular"], "vue": ["vue", "vue.js"], "node.js": ["node.js", "nodejs"],
+    "django": ["django"], "flask": ["flask"], "fastapi": ["fastapi"], "spring": ["spring boot"], ".net": [".net", "dotnet"],
+    "graphql": ["graphql"], "rest": ["restful", "rest api", "rest apis"], "grpc": ["grpc"], "microservices": ["microservices"],
+    "pytorch": ["pytorch"], "tensorflow": ["tensorflow"], "scikit-learn": ["scikit-learn", "sklearn"],
+    "machine learning": ["machine learning", "ml"], "deep learning": ["deep learning"], "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision"], "llm": ["llm", "llms", "large language models"],
+    "data analysis": ["data analysis"], "tableau": ["tableau"], "power bi": ["power bi"], "excel": ["excel"],
+    "figma": ["figma"], "ios": ["ios"], "android": ["android"], "salesforce": ["salesforce"], "sap": ["sap"],
+    "agile": ["agile", "scrum"], "product management": ["product management"],
+    "patient care": ["patient care"], "nursing": ["nursing", "registered nurse"], "accounting": ["accounting", "cpa"],
+    "seo": ["seo"],
+}
+
+ALIASES = {alias: skill for skill, aliases in SKILLS.items() for alias in aliases}
+SKILL_PATTERN = re.compile(
+    r"(?<![\w+#./-])(" + "|".join(re.escape(alias) for alias in sorted(ALIASES, key=len, reverse=True)) + r")(?![\w+#/-])",
+    re.IGNORECASE,
+)
+
+# Seniority levels, lowest first
+LEVELS = [
+    (0, re.compile(r"\b(intern|internship|trainee|apprentice)\b", re.IGNORECASE)),
+    (1, re.compile(r"\b(junior|jr\.?|entry[- ]level|graduate)\b", re.IGNORECASE)),
+    (3, re.compile(r"\b(senior|sr\.?)\b", re.IGNORECASE)),
+    (4, re.compile(r"\b(staff|principal|lead|architect)\b", re.IGNORECASE)),
+    (5, re.compile(r"\b(director|head of|vp|vice president|chief)\b", re.IGNORECASE)),
+]
+YEARS_PATTERN = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+# "5+ years of professional experience", "3 yrs relevant experience": years that describe a person, not a company
+EXPERIENCE_PATTERN = re.compile(
+    r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:[a-z-]+\s+){0,2}experience\b", re.IGNORECASE
+)
+REQUIRED_HEADING = re.compile(
+    r"^\W*(requirements|required|must[- ]haves?|qualifications|minimum qualifications|what you('ll)? need|you have|you bring)\b",
+    re.IGNORECASE,
+)
+OTHER_HEADING = re.compile(
+    r"^\W*(nice[- ]to[- ]haves?|preferred|bonus|benefits|perks|responsibilities|what you('ll)? do|about|what we offer|how to apply)\b",
+    re.IGNORECASE,
+)
+# Only a labelled value counts: "Office snacks..." or "Our location is great" name no place
+LOCATION_LINE = re.compile(r"^\W*(?:location|based in)\W*:\W*(.+?)\W*$", re.IGNORECASE)
+PLACE_PATTERN = re.compile(r"^[A-Z][\w .,'()/&-]*$")
+REMOTE_PATTERN = re.compile(r"\b(remote|work from home|wfh|anywhere)\b", re.IGNORECASE)
+
+
+def extract_skills(text: str) -> set[str]:
+    return {ALIASES[match.lower()] for match in SKILL_PATTERN.findall(text)}
+
+
+def years_to_level(years: int) -> int:
+    return 1 if years < 2 else 2 if years < 5 else 3 if years < 9 else 4
+
+
+def experience_years(text: str) -> list[int]:
+    return [int(value) for value in EXPERIENCE_PATTERN.findall(text)]
+
+
+def looks_like_place(value: str) -> bool:
+    """A short capitalized name like "Berlin, Germany" or "New York, NY (Hybrid)", not a sentence"""
+    return bool(PLACE_PATTERN.match(value)) and len(value.split()) <= 6
+
+
+def title_level(text: str) -> int | None:
+    levels = [level for level, pattern in LEVELS if pattern.search(text)]
+    return max(levels) if levels else None
+
+
+@dataclass
+class Posting:
+    """Facts extracted once from a posting's text"""
+    skills: set[str]
+    required: set[str]
+    level: int | None
+    years: int | None
+    remote: bool
+    location: str
+
+
+@dataclass
+class PreScore:
+    score: int
+    matched: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    reasons: list[str] = field(default_factory=list)
+
+    @property
+    def ruled_out(self) -> bool:
+        return bool(self.reasons)
+
+    def result(self) -> dict:
+        """A matcher-shaped result for a posting ruled out without the LLM"""
+        return {
+            "is_match": False,
+            "reason": "Ruled out without AI review: " + "; ".join(self.reasons).rstrip(".") + ".",
+            "match_score": str(min(self.score, 25)),
+            "key_strengths": [f"Experience with {skill}" for skill in self.matched[:3]] or ["N/A"],
+            "missing_skills": self.missing[:3] or ["N/A"],
+            "improvement_suggestions": [f"Build and highlight experience with {skill}" for skill in self.missing[:2]] or ["N/A"],
+            "prescored": True,
+        }
+
+
+class PreScorer:
+    """
+    Rule- and overlap-based scoring of postings against a resume, without an LLM.
+
+    Skills come from a fixed vocabulary, so scoring is deterministic. A posting
+    is ruled out only on a clear signal: it names at least `min_required`
+    required skills and the resume covers less than `min_coverage` of them,
+    its seniority is two or more levels away from the resume's, or it is
+    on-site somewhere outside `locations`.
+    """
+
+    def __init__(self, enabled: bool | None = None, min_coverage: float | None = None,
+                 locations: list[str] | None = None, min_required: int = 3, cache_size: int = 4096):
+        self.enabled = enabled if enabled is not None else os.getenv("PRESCORE_ENABLED", "0") == "1"
+        self.min_coverage = min_coverage if min_coverage is not None else float(os.getenv("PRESCORE_MIN_COVERAGE", "0.2"))
+        if locations is None:
+            locations = [place.strip() for place in os.getenv("PRESCORE_LOCATIONS", "").split(",")]
+        self.locations = [place.lower() for place in locations if place]
+        self.min_required = min_required
+        self.cache_size = cache_size
+        self._postings = OrderedDict()
+
+    def analyze(self, text: str) -> Posting:
+        key = content_hash(text)
+        if key in self._postings:
+            self._postings.move_to_end(key)
+            return self._postings[key]
+
+        lines = text.splitlines()
+        required = set()
+        # Years only count in experience phrases, or anywhere in the requirements section
+        years = experience_years(text)
+        location = ""
+        in_required = False
+        for line in lines:
+            if REQUIRED_HEADING.match(line):
+                in_required = True
+            elif OTHER_HEADING.match(line):
+                in_required = False
+            elif in_required:
+                required |= extract_skills(line)
+                years.extend(int(value) for value in YEARS_PATTERN.findall(line))
+            match = LOCATION_LINE.match(line)
+            if match and not location and looks_like_place(match.group(1)):
+                location = match.group(1)
+
+        title = next((line for line in lines if line.strip()), "")
+        posting = Posting(
+            skills=extract_skills(text),
+            required=required,
+            level=title_level(title),
+            years=max(years) if years else None,
+            remote=bool(REMOTE_PATTERN.search(text)),
+            location=location,
+        )
+        self._postings[key] = posting
+        if len(self._postings) > self.cache_size:
+            self._postings.popitem(last=False)
+        return posting
+
+    def candidate_level(self, resume: str) -> tuple[int | None, int | None]:
+        """The resume's seniority level and years of experience, when stated"""
+        years = experience_years(resume)
+        total = max(years) if years else None
+        header = "\n".join(resume.strip().splitlines()[:5])
+        level = title_level(header)
+        if total is not None:
+            level = max(level or 0, years_to_level(total))
+        return level, total
+
+    def score_many(self, resume: str, postings: list[str]) -> list[PreScore]:
+        """Score every posting against the resume using an inverted skill index"""
+        with span("prescore"):
+            analyzed = [self.analyze(text) for text in postings]
+            index = defaultdict(list)
+            for i, posting in enumerate(analyzed):
+                for skill in posting.skills:
+                    index[skill].append(i)
+
+            resume_skills = extract_skills(resume)
+            overlap = [set() for _ in analyzed]
+            for skill in resume_skills:
+                for i in index.get(skill, ()):
+                    overlap[i].add(skill)
+
+            level, years = self.candidate_level(resume)
+            scores = []
+            for posting, matched in zip(analyzed, overlap):
+                missing = sorted(posting.required - matched)
+                coverage = len(matched) / len(posting.skills) if posting.skills else 0.5
+                if posting.required:
+                    required_coverage = 1 - len(missing) / len(posting.required)
+                    coverage = 0.7 * required_coverage + 0.3 * coverage
+                prescore = PreScore(round(100 * coverage), sorted(matched), missing)
+
+                if len(posting.required) >= self.min_required and 1 - len(missing) / len(posting.required) < self.min_coverage:
+                    prescore.reasons.append(
+                        f"the resume shows {len(posting.required) - len(missing)} of {len(posting.required)} required skills"
+                    )
+                if level is not None and posting.level is not None and abs(posting.level - level) >= 2:
+                    direction = "senior" if posting.level > level else "junior"
+                    prescore.reasons.append(f"the role is much more {direction} than the resume")
+                elif years is not None and posting.years is not None and posting.years - years >= 4:
+                    prescore.reasons.append(f"the role asks for {posting.years}+ years and the resume shows {years}")
+                if self.locations and not posting.remote and posting.location and not any(
+                    place in posting.location.lower() for place in self.locations
+                ):
+                    prescore.reasons.append(f"the role is on-site in {posting.location}")
+                scores.append(prescore)
+        return scores
+
+    def rule_out(self, resume: str, postings: list[str]) -> list[dict | None]:
+        """Local results for the postings confidently ruled out, None for the rest"""
+        if not self.enabled or not postings:
+            return [None] * len(postings)
+        results = [prescore.result() if prescore.ruled_out else None for prescore in self.score_many(resume, postings)]
+        avoided = sum(result is not None for result in results)
+        if avoided:
+            count("llm_calls_avoided", avoided, reason="prescore")
+        return results
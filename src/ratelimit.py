@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+from .metrics import count, span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Throttled(Exception):
+    """A retryable failure: HTTP 429/5xx or a dropped connection"""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Seconds in a rate-limit header: "12", "1.5", "20ms", "6m0s" or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(headers) -> float | None:
+    if headers is None:
+        return None
+    milliseconds = parse_duration(headers.get("retry-after-ms"))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return parse_duration(headers.get("retry-after"))
+
+
+class TokenBucket:
+    """
+    Budget of `limit` units per minute, refilled continuously.
+
+    Reservations may drive the level negative; the caller then waits until it
+    has refilled back to zero, so callers are served in reservation order
+    without holding a lock while they sleep.
+    """
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.level = limit
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.limit > 0:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / 60)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` units and return the seconds until they are available"""
+        if self.limit <= 0 or amount <= 0:
+            return 0.0
+        self._refill(now)
+        self.level -= min(amount, self.limit)
+        return -self.level * 60 / self.limit if self.level < 0 else 0.0
+
+    def adjust(self, amount: float, now: float):
+        """Charge (or refund) the difference between an estimate and the actual usage"""
+        if self.limit > 0:
+            self._refill(now)
+            self.level = min(self.limit, self.level - amount)
+
+    def sync(self, now: float, limit: float | None = None, remaining: float | None = None, reset: float | None = None):
+        """Align the bucket with the limits the server reports"""
+        self._refill(now)
+        if limit:
+            self.level = min(limit, self.level) if self.limit > 0 else limit
+            self.limit = limit
+        if remaining is not None and self.limit > 0:
+            # The server's view includes other clients sharing the same key
+            self.level = min(self.level, remaining)
+            if remaining < 1 and reset:
+                # Exhausted: the next unit is available when the window resets
+                self.level = min(self.level, 1 - reset * self.limit / 60)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute budget for one API.
+
+    Every call reserves one request and its estimated tokens before it is sent,
+    the budgets follow the x-ratelimit-* headers of each response, and calls
+    that raise `Throttled` are retried with jittered exponential backoff. A
+    Retry-After from the server pauses every caller, not just the one that was
+    rejected.
+    """
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, max_retries: int = 6,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._paused_until = 0.0
+        # Sessions run their own event loops in separate threads; the lock only
+        # guards the bookkeeping, never a sleep.
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix: str, rpm: str = "0", tpm: str = "0") -> "RateLimiter":
+        return cls(
+            prefix.lower(),
+            rpm=float(os.getenv(f"{prefix}_RPM", rpm)),
+            tpm=float(os.getenv(f"{prefix}_TPM", tpm)),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", "6")),
+        )
+
+    async def acquire(self, tokens: float = 0):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(tokens, now),
+                self._paused_until - now,
+            )
+        if delay > 0:
+            with span("rate_limit_wait", api=self.name):
+                await asyncio.sleep(delay)
+
+    def settle(self, estimated: float, actual: float):
+        with self._lock:
+            self.tokens.adjust(actual - estimated, time.monotonic())
+
+    def observe(self, headers):
+        """Adapt the budgets to the rate-limit headers of a response"""
+        if headers is None:
+            return
+
+        def number(name):
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                limit = number(f"x-ratelimit-limit-{kind}")
+                remaining = number(f"x-ratelimit-remaining-{kind}")
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if kind == "requests" and limit is None and remaining is None:
+                    limit = number("x-ratelimit-limit")
+                    remaining = number("x-ratelimit-remaining")
+                    reset = parse_duration(headers.get("x-ratelimit-reset"))
+                if limit is not None or remaining is not None:
+                    bucket.sync(now, limit, remaining, reset)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.base_delay)
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
+        # Full jitter keeps concurrent retries from arriving in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, fn: Callable[[], Awaitable[T]], tokens: float = 0) -> T:
+        """Run `fn` within the budget, retrying while it raises `Throttled`"""
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            try:
+                return await fn()
+            except Throttled as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e.retry_after)
+                attempt += 1
+                self.retries += 1
+                count("retries", api=self.name)
+                logger.warning(f"{self.name} throttled ({str(e)}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(prefix: str, rpm: str = "0", tpm: str = "0") -> RateLimiter:
+    """Process-wide limiter for one API, configured from `<prefix>_RPM`/`_TPM`/`_MAX_RETRIES`"""
+    with _limiters_lock:
+        if prefix not in _limiters:
+            _limiters[prefix] = RateLimiter.from_env(prefix, rpm, tpm)
+        return _limiters[prefix]
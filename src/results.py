@@ -0,0 +1,114 @@
+import sys
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator
+
+MAX_SCORE = 100
+
+
+def _score(value) -> int:
+    try:
+        return min(max(int(value), 0), MAX_SCORE)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _items(values) -> tuple[str, ...]:
+    # "N/A" placeholders are dropped here so rendering only has to check for emptiness
+    return tuple(str(value) for value in values or () if value != "N/A")
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    """One evaluated job, with its score as an int and its title and company interned"""
+    title: str
+    company: str
+    url: str
+    score: int
+    is_match: bool
+    reason: str
+    key_strengths: tuple[str, ...] = ()
+    missing_skills: tuple[str, ...] = ()
+    improvement_suggestions: tuple[str, ...] = ()
+    cached: bool = False
+    prescored: bool = False
+    throttled: bool = False
+
+    @classmethod
+    def from_result(cls, job, result: dict) -> "MatchRecord":
+        score = _score(result.get("match_score"))
+        return cls(
+            title=sys.intern(job.title),
+            company=sys.intern(job.company),
+            url=job.url,
+            score=score,
+            is_match=bool(result.get("is_match")) and score >= 50,
+            reason=result.get("reason", ""),
+            key_strengths=_items(result.get("key_strengths")),
+            missing_skills=_items(result.get("missing_skills")),
+            improvement_suggestions=_items(result.get("improvement_suggestions")),
+            cached=bool(result.get("cached")),
+            prescored=bool(result.get("prescored")),
+            throttled=bool(result.get("throttled")),
+        )
+
+
+class ResultStore:
+    """
+    Results of an analysis, indexed by score.
+
+    Records are bucketed by their integer score, so adding one is O(1) and
+    the leaderboard is read best-first without sorting. Within a score,
+    records keep their arrival order. Throttled jobs are kept apart: they
+    were never scored.
+    """
+
+    def __init__(self):
+        self.records: list[MatchRecord] = []
+        self._by_score: list[list[int]] = [[] for _ in range(MAX_SCORE + 1)]
+        self.throttled: list[MatchRecord] = []
+        self.cached_count = 0
+        self.prescored_count = 0
+        self.match_count = 0
+
+    def add(self, job, result: dict) -> MatchRecord:
+        record = MatchRecord.from_result(job, result)
+        if record.throttled:
+            self.throttled.append(record)
+            return record
+        self._by_score[record.score].append(len(self.records))
+        self.records.append(record)
+        self.cached_count += record.cached
+        self.prescored_count += record.prescored
+        self.match_count += record.is_match
+        return record
+
+    def extend(self, pairs):
+        for job, result in pairs:
+            self.add(job, result)
+
+    def __len__(self) -> int:
+        """Number of jobs handled, scored or throttled"""
+        return len(self.records) + len(self.throttled)
+
+    def ranked(self, min_score: int = 0, matches_only: bool = False, query: str = "") -> Iterator[MatchRecord]:
+        """Scored records, best first, optionally filtered"""
+        query = query.casefold()
+        for score in range(MAX_SCORE, max(min_score, 0) - 1, -1):
+            for index in self._by_score[score]:
+                record = self.records[index]
+                if matches_only and not record.is_match:
+                    continue
+                if query and query not in record.title.casefold() and query not in record.company.casefold():
+                    continue
+                yield record
+
+    def count(self, min_score: int = 0, matches_only: bool = False, query: str = "") -> int:
+        if not query and not matches_only:
+            return sum(len(bucket) for bucket in self._by_score[max(min_score, 0):])
+        return sum(1 for _ in self.ranked(min_score, matches_only, query))
+
+    def page(self, number: int, size: int, **filters) -> list[MatchRecord]:
+        """The `number`-th page (from 0) of `size` ranked records"""
+        start = max(number, 0) * size
+        return list(islice(self.ranked(**filters), start, start + size))
@@ -0,0 +1,141 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+
+from .cache import open_db
+from .metrics import count, span
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeLoader:
+    """
+    Loads resume text, re-parsing only when the underlying document changes.
+
+    Parsed text is stored keyed by the SHA-256 of the document bytes. For URLs,
+    the document's ETag/Last-Modified are remembered so an unchanged resume
+    costs one conditional request and no Firecrawl credits. A URL that can't
+    be downloaded directly (e.g. a share link behind a login) has no
+    validators to check, so its last parse is reused for `unverified_max_age`
+    seconds and then parsed again.
+    """
+
+    def __init__(self, scraper=None, filename: str = "resumes.db", unverified_max_age: float | None = None):
+        self.scraper = scraper
+        self.unverified_max_age = (
+            unverified_max_age if unverified_max_age is not None
+            else float(os.getenv("RESUME_UNVERIFIED_MAX_AGE_HOURS", "1")) * 3600
+        )
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                doc_hash TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                parsed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS resume_urls (
+                url TEXT PRIMARY KEY,
+                doc_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            """
+        )
+
+    def _text(self, doc_hash: str, max_age: float | None = None) -> str | None:
+        with self._lock:
+            row = self.conn.execute("SELECT text, parsed_at FROM resumes WHERE doc_hash = ?", (doc_hash,)).fetchone()
+        if row is None or (max_age is not None and row[1] < time.time() - max_age):
+            return None
+        count("cache_hits", cache="resume")
+        return row[0]
+
+    def _store(self, doc_hash: str, text: str):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resumes (doc_hash, text, parsed_at) VALUES (?, ?, ?)",
+                (doc_hash, text, time.time()),
+            )
+
+    def _remember_url(self, url: str, doc_hash: str, etag: str | None, last_modified: str | None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resume_urls (url, doc_hash, etag, last_modified) VALUES (?, ?, ?, ?)",
+                (url, doc_hash, etag, last_modified),
+            )
+
+    async def load_url(self, url: str) -> str:
+        """Return the text of the resume at `url`, parsing it with Firecrawl only if it changed"""
+        import httpx
+
+        if self.scraper is None:
+            raise ValueError("A JobScraper is required to parse resumes from a URL.")
+
+        with self._lock:
+            known = self.conn.execute(
+                "SELECT doc_hash, etag, last_modified FROM resume_urls WHERE url = ?", (url,)
+            ).fetchone()
+
+        headers = {}
+        if known and known[1]:
+            headers["If-None-Match"] = known[1]
+        if known and known[2]:
+            headers["If-Modified-Since"] = known[2]
+
+        try:
+            response = await self.scraper.origin_client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not fetch resume document {url}: {str(e)}")
+            response = None
+
+        if response is not None and response.status_code == 304 and known:
+            text = self._text(known[0])
+            if text is not None:
+                return text
+
+        if response is not None and response.status_code == 200:
+            doc_hash = hashlib.sha256(response.content).hexdigest()
+            etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        else:
+            # The document could not be downloaded directly, so there is no way to tell whether it
+            # changed; the last parse is only reused while recent, then Firecrawl parses it again
+            text = self._text(known[0], self.unverified_max_age) if known else None
+            if text is not None:
+                return text
+            doc_hash = etag = last_modified = None
+
+        text = self._text(doc_hash) if doc_hash else None
+        if text is None:
+            logger.info(f"Parsing resume {url}")
+            count("cache_misses", cache="resume")
+            with span("resume_parse", source="url"):
+                text = await self.scraper.parse_resume(url)
+            if doc_hash is None:
+                doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                if known and known[0] == doc_hash:
+                    logger.info(f"Resume {url} is unchanged")
+            self._store(doc_hash, text)
+        self._remember_url(url, doc_hash, etag, last_modified)
+        return text
+
+    def load_pdf(self, pdf_file) -> str:
+        """Return the text of an uploaded PDF, extracting it only the first time it is seen"""
+        data = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+        doc_hash = hashlib.sha256(data).hexdigest()
+        text = self._text(doc_hash)
+        if text is None:
+            from .pdf_processor import PDFProcessor
+
+            buffer = io.BytesIO(data)
+            buffer.name = getattr(pdf_file, "name", "uploaded PDF")
+            count("cache_misses", cache="resume")
+            with span("resume_parse", source="pdf"):
+                text = PDFProcessor.extract_text_from_pdf(buffer)
+            if not text.startswith("Error processing PDF"):
+                self._store(doc_hash, text)
+        return text
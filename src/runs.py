@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+from .cache import content_hash, open_db
+
+
+def run_key(*parts) -> str:
+    """Identity of a run's inputs: runs with the same key can resume each other"""
+    return content_hash(json.dumps(parts, sort_keys=True, default=str))[:16]
+
+
+class Run:
+    """
+    One checkpointed run: the outputs of its finished items, by stage.
+
+    Outputs are written as soon as each item finishes, each in its own
+    transaction, so an interrupted run loses at most the items in flight.
+    """
+
+    def __init__(self, journal: "RunJournal", run_id: str, resumed: bool):
+        self.journal = journal
+        self.id = run_id
+        self.resumed = resumed
+
+    def get(self, stage: str, item: str):
+        return self.journal._get(self.id, stage, item)
+
+    def put(self, stage: str, item: str, output):
+        self.journal._put(self.id, stage, item, output)
+
+    def outputs(self, stage: str) -> dict:
+        """Every journaled output of a stage, by item"""
+        return self.journal._outputs(self.id, stage)
+
+    def complete(self):
+        """Mark the run finished; its journal is no longer needed for resuming"""
+        self.journal._finish(self.id)
+
+
+class RunJournal:
+    """
+    On-disk journal of unfinished runs of the app and the scheduler.
+
+    Starting a run with the same kind and input key as an unfinished run
+    younger than `max_age` resumes it, so completed scrapes and matches are
+    reused instead of being fetched and scored again. Finished and expired
+    runs are deleted once they are older than `max_age` too, along with any
+    journaled outputs left behind, so the journal only holds recent runs.
+    """
+
+    def __init__(self, filename: str = "runs.db", max_age: float | None = None):
+        self.max_age = max_age if max_age is not None else float(os.getenv("RUN_RESUME_MAX_AGE_HOURS", "6")) * 3600
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_key ON runs (kind, key, status);
+            CREATE INDEX IF NOT EXISTS runs_updated_at ON runs (updated_at);
+            CREATE TABLE IF NOT EXISTS run_items (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                item TEXT NOT NULL,
+                output TEXT NOT NULL,
+                PRIMARY KEY (run_id, stage, item)
+            );
+            """
+        )
+        with self._lock:
+            self._prune(time.time())
+
+    def start(self, kind: str, key: str) -> Run:
+        """Resume the latest unfinished run for these inputs, or start a new one"""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            row = self.conn.execute(
+                "SELECT id FROM runs WHERE kind = ? AND key = ? AND status = 'running' ORDER BY updated_at DESC LIMIT 1",
+                (kind, key),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE runs SET updated_at = ? WHERE id = ?", (now, row[0]))
+                return Run(self, row[0], resumed=True)
+            run_id = uuid.uuid4().hex[:12]
+            self.conn.execute(
+                "INSERT INTO runs (id, kind, key, status, started_at, updated_at) VALUES (?, ?, ?, 'running', ?, ?)",
+                (run_id, kind, key, now, now),
+            )
+        return Run(self, run_id, resumed=False)
+
+    def _prune(self, now: float):
+        # Runs left unfinished for too long are stale (listings change), so they start over
+        stale = [run_id for (run_id,) in self.conn.execute(
+            "SELECT id FROM runs WHERE status = 'running' AND updated_at < ?", (now - self.max_age,)
+        )]
+        for run_id in stale:
+            self.conn.execute("DELETE FROM run_items WHERE run_id = ?", (run_id,))
+            self.conn.execute("UPDATE runs SET status = 'expired' WHERE id = ?", (run_id,))
+        # Finished runs are only kept as long as unfinished ones, and nothing outlives its run
+        self.conn.execute("DELETE FROM runs WHERE status != 'running' AND updated_at < ?", (now - self.max_age,))
+        self.conn.execute("DELETE FROM run_items WHERE run_id NOT IN (SELECT id FROM runs WHERE status = 'running')")
+
+    def _get(self, run_id: str, stage: str, item: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT output FROM run_items WHERE run_id = ? AND stage = ? AND item = ?", (run_id, stage, item)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, run_id: str, stage: str, item: str, output):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO run_items (run_id, stage, item, output) VALUES (?, ?, ?, ?)",
+                (run_id, stage, item, json.dumps(output)),
+            )
+            self.conn.execute("UPDATE runs SET updated_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def _outputs(self, run_id: str, stage: str) -> dict:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT item, output FROM run_items WHERE run_id = ? AND stage = ?", (run_id, stage)
+            ).fetchall()
+        return {item: json.loads(output) for item, output in rows}
+
+    def _finish(self, run_id: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM run_items WHERE run_id = ?", (run_id,))
+            self.conn.execute("UPDATE runs SET status = 'complete', updated_at = ? WHERE id = ?", (time.time(), run_id))
@@ -1,86 +1,299 @@
 import asyncio
 import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from .scraper import JobScraper
 from .matcher import JobMatcher
+from .prefilter import JobPreFilter
+from .store import ProcessedJobStore
+from .history import MatchHistory
+from .runs import RunJournal, run_key
+from .resume import ResumeLoader
+from .cache import content_hash
+from .ratelimit import Throttled
+from . import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 
+@dataclass
+class Stage:
+    """Worker count and per-item timeout of one pipeline stage"""
+    workers: int
+    timeout: float
+
+
+@dataclass
+class SourceBatch:
+    """Jobs found on one source page, collected so the pre-filter can rank them together"""
+    source_url: str
+    pending: int
+    fetched: list = field(default_factory=list)
+
+
 class JobScheduler:
     def __init__(self):
         self.scraper = JobScraper()
         self.matcher = JobMatcher()
+        self.prefilter = JobPreFilter()
+        self.resume_loader = ResumeLoader(self.scraper)
         self.resume_url = os.getenv("RESUME_URL")
         self.check_interval = int(os.getenv("CHECK_INTERVAL_MINUTES", "15"))
-        self.processed_jobs = set()
+        self.store = ProcessedJobStore()
+        self.history = MatchHistory()
+        # Each cycle is a checkpointed run; one that didn't finish is resumed by the next cycle
+        self.journal = RunJournal()
+        self.current_run = None
         self.job_urls = []
-        
-        # Add job URLs here or load from a file
+
+        # Add job URLs here or load from a file (one URL per line) via JOB_URLS_FILE
         # Example: self.job_urls = ["https://example.com/job1", "https://example.com/job2"]
-        
+        job_urls_file = os.getenv("JOB_URLS_FILE")
+        if job_urls_file:
+            with open(job_urls_file) as f:
+                self.job_urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+        # Pipeline: sources -> listings -> content -> match, each stage with its own queue and workers
+        self.queue_size = int(os.getenv("SCHEDULER_QUEUE_SIZE", "100"))
+        self.cycle_budget = float(os.getenv("SCHEDULER_CYCLE_BUDGET_MINUTES", "10")) * 60
+        self.stages = {
+            "listings": Stage(
+                int(os.getenv("SCHEDULER_LISTING_WORKERS", "4")),
+                float(os.getenv("SCHEDULER_LISTING_TIMEOUT_SECONDS", "180")),
+            ),
+            "content": Stage(
+                int(os.getenv("SCHEDULER_CONTENT_WORKERS", "10")),
+                float(os.getenv("SCHEDULER_CONTENT_TIMEOUT_SECONDS", "90")),
+            ),
+            "match": Stage(
+                int(os.getenv("SCHEDULER_MATCH_WORKERS", "5")),
+                float(os.getenv("SCHEDULER_MATCH_TIMEOUT_SECONDS", "120")),
+            ),
+        }
+        self.stats = Counter()
+
         logger.info(f"Initialized scheduler with {self.check_interval} minute interval")
 
-    async def process_job_url(self, job_url):
-        """Process a single job URL"""
-        try:
-            logger.info(f"Processing job URL: {job_url}")
+    async def _listing_worker(self, sources: asyncio.Queue, contents: asyncio.Queue, resume_hash: str):
+        """Scrape each source page for job listings and forward the ones that need evaluating"""
+        stage = self.stages["listings"]
+        while True:
+            source_url = await sources.get()
+            try:
+                journaled = self.current_run.get("listings", source_url)
+                if journaled is not None:
+                    from .models import Job
+                    jobs = [Job(**job) for job in journaled]
+                    logger.info(f"Resuming {len(jobs)} jobs from {source_url}")
+                    await self._queue_jobs(source_url, jobs, contents)
+                    continue
+
+                logger.info(f"Processing job URL: {source_url}")
+                diff = await asyncio.wait_for(self.scraper.diff_job_postings(source_url), stage.timeout)
+                logger.info(f"Found {len(diff.jobs)} jobs from {source_url}")
+                self.stats["jobs_found"] += len(diff.jobs)
+                if not diff.extracted:
+                    self.stats["sources_unchanged"] += 1
 
-            # Parse resume
-            resume_content = await self.scraper.parse_resume(self.resume_url)
+                # Jobs still listed unchanged only go downstream if this resume hasn't seen them yet
+                jobs = diff.new_or_changed
+                for job in diff.unchanged:
+                    if self.store.is_evaluated(job.url, resume_hash, self.prefilter.settings):
+                        self.store.touch(job.url)
+                        self.stats["unchanged"] += 1
+                    else:
+                        jobs.append(job)
+                self.current_run.put("listings", source_url, [job.model_dump() for job in jobs])
+                await self._queue_jobs(source_url, jobs, contents)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                logger.error(f"Timed out after {stage.timeout:g}s scraping job URL {source_url}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Error processing job URL {source_url}: {str(e)}")
+            finally:
+                sources.task_done()
 
-            # Get jobs from URL
-            jobs = await self.scraper.scrape_job_postings([job_url])
-            logger.info(f"Found {len(jobs)} jobs from {job_url}")
+    @staticmethod
+    async def _queue_jobs(source_url: str, jobs: list, contents: asyncio.Queue):
+        batch = SourceBatch(source_url, len(jobs))
+        for job in jobs:
+            await contents.put((job, batch))
 
-            # Process new jobs
-            for job in jobs:
-                if job.url in self.processed_jobs:
+    async def _content_worker(self, contents: asyncio.Queue, matches: asyncio.Queue, resume_content: str, resume_hash: str):
+        """Fetch job content and drop jobs already evaluated against this content and resume"""
+        stage = self.stages["content"]
+        while True:
+            job, batch = await contents.get()
+            try:
+                job_content = await asyncio.wait_for(self.scraper.scrape_job_content(job.url, self.current_run), stage.timeout)
+                job_hash = content_hash(job_content)
+                if self.store.is_unchanged(job.url, job_hash, resume_hash, self.prefilter.settings):
                     logger.debug(f"Skipping already processed job: {job.url}")
-                    continue
+                    self.store.touch(job.url)
+                    self.stats["unchanged"] += 1
+                else:
+                    batch.fetched.append((job, job_content, job_hash))
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                logger.error(f"Timed out after {stage.timeout:g}s fetching job {job.url}")
+            except Throttled as e:
+                self.stats["throttled"] += 1
+                logger.warning(f"Rate limited fetching job {job.url}, retrying next cycle: {str(e)}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Error fetching job {job.url}: {str(e)}")
+            finally:
+                batch.pending -= 1
+                if batch.pending == 0:
+                    await self._forward(batch, matches, resume_content, resume_hash)
+                contents.task_done()
+
+    async def _forward(self, batch: SourceBatch, matches: asyncio.Queue, resume_content: str, resume_hash: str):
+        """Pre-filter a completed source batch and queue the survivors for matching (top-k applies per batch)"""
+        selected, skipped = self.prefilter.select(
+            resume_content, batch.fetched, [job_content for _, job_content, _ in batch.fetched]
+        )
+        if skipped:
+            logger.info(f"Pre-filter skipped {len(skipped)} of {len(batch.fetched)} jobs from {batch.source_url}, saving {len(skipped)} LLM calls")
+            self.stats["prefiltered"] += len(skipped)
+        # Marked with the pre-filter settings, so changing them sends these postings to the matcher again
+        for (job, _, job_hash), _ in skipped:
+            self.store.record(job.url, job_hash, resume_hash, prefilter=self.prefilter.settings)
+        for item, _ in selected:
+            await matches.put(item)
+
+    async def _match_worker(self, matches: asyncio.Queue, resume_content: str, resume_hash: str):
+        """Evaluate jobs against the resume and persist each result as soon as it is ready"""
+        stage = self.stages["match"]
+        while True:
+            # Take whatever is already queued, up to one matcher batch
+            batch = [await matches.get()]
+            while len(batch) < self.matcher.batch_size and not matches.empty():
+                batch.append(matches.get_nowait())
+            try:
+                results = await asyncio.wait_for(
+                    self.matcher.evaluate_batch(resume_content, [job_content for _, job_content, _ in batch]),
+                    stage.timeout,
+                )
+                for (job, _, job_hash), result in zip(batch, results):
+                    self.stats["evaluated"] += 1
+                    if result.get("prescored"):
+                        self.stats["prescored"] += 1
+
+                    if result["is_match"]:
+                        self.stats["matches"] += 1
+                        logger.info(f"Found match: {job.title} at {job.company}")
+                        # Match found, but no notification sent (Discord removed)
 
-                job_content = await self.scraper.scrape_job_content(job.url)
-                result = await self.matcher.evaluate_match(resume_content, job_content)
+                    # Local rule-outs aren't stored: they are free to redo, and a wrong one must not stick
+                    if not result.get("error") and not result.get("prescored"):
+                        self.store.record(job.url, job_hash, resume_hash, result)
+                self.history.record_many(((job, result) for (job, _, _), result in zip(batch, results)), resume_hash, "scheduler")
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                logger.error(f"Timed out after {stage.timeout:g}s evaluating {len(batch)} jobs")
+            except Throttled as e:
+                # Nothing is recorded, so these jobs are evaluated again next cycle
+                self.stats["throttled"] += len(batch)
+                logger.warning(f"Rate limited evaluating {len(batch)} jobs, retrying next cycle: {str(e)}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Error evaluating {len(batch)} jobs: {str(e)}")
+            finally:
+                for _ in batch:
+                    matches.task_done()
+
+    async def _drain(self, sources: asyncio.Queue, contents: asyncio.Queue, matches: asyncio.Queue):
+        for job_url in self.job_urls:
+            await sources.put(job_url)
+        # Each stage hands its output to the next before marking items done,
+        # so joining in order waits for the whole pipeline to empty.
+        for queue in (sources, contents, matches):
+            await queue.join()
 
-                if result["is_match"]:
-                    logger.info(f"Found match: {job.title} at {job.company}")
-                    # Match found, but no notification sent (Discord removed)
+    @metrics.timed("cycle")
+    async def run_cycle(self):
+        """Run one pass over every configured source within the cycle budget"""
+        self.stats = Counter()
+        started = time.monotonic()
 
-                self.processed_jobs.add(job.url)
+        # Parse resume once per cycle; unchanged resumes are served from the store
+        resume_content = await self.resume_loader.load_url(self.resume_url)
+        resume_hash = content_hash(" ".join(resume_content.split()))
+        self.current_run = self.journal.start("scheduler", run_key(resume_hash, self.job_urls))
+        if self.current_run.resumed:
+            logger.info(f"Resuming unfinished run {self.current_run.id}")
+
+        sources = asyncio.Queue(self.queue_size)
+        contents = asyncio.Queue(self.queue_size)
+        matches = asyncio.Queue(self.queue_size)
+        workers = [
+            *(asyncio.create_task(self._listing_worker(sources, contents, resume_hash))
+              for _ in range(self.stages["listings"].workers)),
+            *(asyncio.create_task(self._content_worker(contents, matches, resume_content, resume_hash))
+              for _ in range(self.stages["content"].workers)),
+            *(asyncio.create_task(self._match_worker(matches, resume_content, resume_hash))
+              for _ in range(self.stages["match"].workers)),
+        ]
+        try:
+            await asyncio.wait_for(self._drain(sources, contents, matches), self.cycle_budget)
+            self.current_run.complete()
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Cycle budget of {self.cycle_budget / 60:g} minutes exhausted; "
+                "unfinished jobs will be picked up next cycle"
+            )
+        finally:
+            # asyncio.wait_for before Python 3.12 can swallow a cancellation that races with the
+            # call it wraps finishing, leaving that worker waiting on its queue; cancel until all stop
+            pending = set(workers)
+            while pending:
+                for worker in pending:
+                    worker.cancel()
+                _, pending = await asyncio.wait(pending, timeout=1)
 
-        except Exception as e:
-            logger.error(f"Error processing job URL {job_url}: {str(e)}")
+        logger.info(f"Cycle finished in {time.monotonic() - started:.1f}s: {dict(self.stats)}")
 
-    async def run(self):
-        """Main scheduling loop"""
+    async def run(self, cycles: int | None = None):
+        """Main scheduling loop; returns after `cycles` cycles if given"""
         logger.info("Starting job scheduler...")
         
         if not self.job_urls:
             logger.warning("No job URLs configured. Please add some job URLs to the scheduler.")
             return
 
+        cycle = 0
         while True:
+            cycle += 1
+            delay = self.check_interval * 60  # Sleep for the configured interval
             try:
                 logger.info(f"Found {len(self.job_urls)} job URLs to process")
-
-                for job_url in self.job_urls:
-                    logger.info(f"Processing job URL {job_url}")
-                    await self.process_job_url(job_url)
-
-                logger.info(f"Sleeping for {self.check_interval} minutes")
-                await asyncio.sleep(self.check_interval * 60)  # Sleep for the configured interval
-
+                cycle_metrics = metrics.collect()
+                await self.run_cycle()
+                logger.info(f"Cycle timings: {cycle_metrics.summary()}")
             except Exception as e:
                 logger.error(f"Scheduler error: {str(e)}")
-                await asyncio.sleep(60)
+                delay = 60
+            if cycle == cycles:
+                return
+
+            logger.info(f"Sleeping for {delay / 60:g} minutes")
+            await asyncio.sleep(delay)
 
 
 async def main():
+    metrics.configure_from_env()
     scheduler = JobScheduler()
-    await scheduler.run()
+    try:
+        await scheduler.run()
+    finally:
+        await scheduler.scraper.aclose()
 
 
 if __name__ == "__main__":
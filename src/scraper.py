@@ -1,48 +1,294 @@
-from urllib import response
-from firecrawl import FirecrawlApp
-from .models import Job, JobListings
-import streamlit as st
+import asyncio
+import logging
 import os
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from .cache import CachedPage, PageCache
+from .metrics import count, span, timed
+from .ratelimit import Throttled, retry_after, shared_limiter
+from .runs import Run
+from .singleflight import SingleFlight
+from .snapshots import ListingDiff, SourceSnapshot, SourceSnapshots, diff_listings, fingerprint
+
+if TYPE_CHECKING:
+    # Imported on first use at runtime, so the scheduler starts without loading them
+    import httpx
+
+    from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Concurrent requests for the same posting, from any scraper in the process, share one fetch
+_content_flight = SingleFlight("page")
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+
+    async def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def validators(metadata: dict | None) -> tuple[str | None, str | None]:
+    """ETag and Last-Modified of a scraped page, when Firecrawl's metadata reports its response headers"""
+    headers = {key.lower().replace("_", "-"): value for key, value in (metadata or {}).items()}
+    etag = headers.get("etag")
+    last_modified = headers.get("last-modified") or headers.get("lastmodified")
+    return (
+        etag if isinstance(etag, str) else None,
+        last_modified if isinstance(last_modified, str) else None,
+    )
 
-@st.cache_data(show_spinner=False)
-def _cached_parse_resume(pdf_link: str) -> str:
-    api_key = os.getenv("FIRECRAWL_API_KEY")
-    if not api_key:
-        raise ValueError("Firecrawl API key is required. Please enter it in the sidebar.")
-    app = FirecrawlApp(api_key=api_key)
-    response = app.scrape_url(url=pdf_link)
-    return response["markdown"]
 
 class JobScraper:
-    def __init__(self):
+    def __init__(self, max_concurrency: int | None = None, host_rate: float | None = None, cache: PageCache | None = None,
+                 snapshots: SourceSnapshots | None = None):
         api_key = os.getenv("FIRECRAWL_API_KEY")
         if not api_key:
             raise ValueError("Firecrawl API key is required. Please enter it in the sidebar.")
-        self.app = FirecrawlApp(api_key=api_key)
+        self.api_key = api_key
+        self.api_url = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev").rstrip("/")
+        self.max_concurrency = max_concurrency or int(os.getenv("SCRAPER_MAX_CONCURRENCY", "10"))
+        self.timeout = float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "120"))
+        # Off by default: requests to one careers host would otherwise queue behind each other
+        self.rate_limiter = HostRateLimiter(
+            host_rate if host_rate is not None else float(os.getenv("SCRAPER_HOST_RATE", "0"))
+        )
+        # Firecrawl's per-key budget is shared by every scraper in the process
+        self.limiter = shared_limiter("FIRECRAWL", rpm="100")
+        self.cache = cache if cache is not None else PageCache()
+        self.snapshots = snapshots if snapshots is not None else SourceSnapshots()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = None
+        self._origin_client = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Shared connection pool, created on first use inside the running loop"""
+        if self._client is None or self._client.is_closed:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    @property
+    def origin_client(self) -> "httpx.AsyncClient":
+        """Unauthenticated client for cheap validator requests against job sites"""
+        if self._origin_client is None or self._origin_client.is_closed:
+            import httpx
+
+            self._origin_client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=10,
+                limits=httpx.Limits(max_connections=self.max_concurrency),
+            )
+        return self._origin_client
+
+    async def aclose(self):
+        for client in (self._client, self._origin_client):
+            if client is not None:
+                await client.aclose()
+        self._client = None
+        self._origin_client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _scrape(self, url: str, **params) -> dict:
+        import httpx
+
+        async def attempt():
+            async with self._semaphore:
+                await self.rate_limiter.wait(url)
+                try:
+                    with span("firecrawl_request"):
+                        response = await self.client.post("/v1/scrape", json={"url": url, **params})
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                    raise Throttled(f"Failed to scrape {url}: {str(e)}") from e
+            self.limiter.observe(response.headers)
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if response.status_code != 200 or not body.get("success"):
+                error = body.get("error") or response.reason_phrase
+                message = f"Failed to scrape {url}. Status code {response.status_code}: {error}"
+                if response.status_code in (429, 502, 503, 504):
+                    raise Throttled(message, retry_after(response.headers))
+                raise Exception(message)
+            return body["data"]
+
+        return await self.limiter.call(attempt)
+
+    async def _head(self, url: str, page: CachedPage | SourceSnapshot | None = None) -> "httpx.Response | None":
+        import httpx
+
+        headers = {}
+        if page is not None and page.etag:
+            headers["If-None-Match"] = page.etag
+        if page is not None and page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        try:
+            async with self._semaphore:
+                # Validator requests hit the job site itself, so they are spaced out like scrapes
+                await self.rate_limiter.wait(url)
+                return await self.origin_client.head(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"Validator request to {url} failed: {str(e)}")
+            return None
+
+    async def _unchanged(self, url: str, page: CachedPage | SourceSnapshot) -> bool:
+        """Revalidate a stale cache entry against the origin without paying for a scrape"""
+        if not page.etag and not page.last_modified:
+            return False
+        response = await self._head(url, page)
+        if response is None:
+            return False
+        if response.status_code == 304:
+            return True
+        if response.status_code != 200:
+            return False
+        if page.etag:
+            return response.headers.get("etag") == page.etag
+        return response.headers.get("last-modified") == page.last_modified
 
     async def parse_resume(self, pdf_link: str) -> str:
-        return _cached_parse_resume(pdf_link)
-
-    async def scrape_job_postings(self, source_urls: list[str]) -> list[Job]:
-        response = self.app.batch_scrape_urls(
-            urls=source_urls,
-            formats=["extract"],
-            extract={
-                "schema": JobListings.model_json_schema(),
-                "prompt": "Extract information based on the schema provided",
-            },
+        data = await self._scrape(pdf_link, formats=["markdown"])
+        return data["markdown"]
+
+    @timed("scrape_job_postings")
+    async def diff_job_postings(self, source_url: str) -> ListingDiff:
+        """
+        List the jobs on one source page, compared with its last snapshot.
+
+        An unchanged page (same markdown fingerprint, or for a snapshot compared
+        recently, the same ETag/Last-Modified) is answered from the snapshot
+        without running Firecrawl's LLM extraction; a changed page is extracted
+        and diffed by job URL.
+        """
+        from .models import Job, JobListings
+
+        snapshot = self.snapshots.get(source_url)
+        # Validators don't move checked_at, so once it ages out the markdown is compared again
+        if snapshot is not None and self.snapshots.is_fresh(snapshot) and await self._unchanged(source_url, snapshot):
+            count("cache_hits", cache="source")
+            return ListingDiff(source_url, unchanged=[Job(**job) for job in snapshot.jobs])
+
+        extract = {
+            "schema": JobListings.model_json_schema(),
+            "prompt": "Extract information based on the schema provided",
+        }
+        # A page seen for the first time is extracted right away; a known one
+        # only once its markdown shows it changed.
+        params = {"formats": ["markdown"]} if snapshot is not None else {"formats": ["markdown", "extract"], "extract": extract}
+        data, head = await asyncio.gather(self._scrape(source_url, **params), self._head(source_url))
+        etag = last_modified = None
+        if head is not None and head.status_code == 200:
+            etag = head.headers.get("etag")
+            last_modified = head.headers.get("last-modified")
+
+        page_fingerprint = fingerprint(data.get("markdown") or "")
+        if snapshot is not None and page_fingerprint == snapshot.fingerprint:
+            self.snapshots.touch(source_url, etag, last_modified)
+            count("cache_hits", cache="source")
+            return ListingDiff(source_url, unchanged=[Job(**job) for job in snapshot.jobs])
+
+        count("cache_misses", cache="source")
+        if "extract" not in data:
+            data = await self._scrape(source_url, formats=["extract"], extract=extract)
+        jobs = [Job(**job).model_dump() for job in (data.get("extract") or {}).get("jobs", [])]
+        self.snapshots.put(source_url, page_fingerprint, jobs, etag, last_modified)
+
+        diff = diff_listings(source_url, snapshot.jobs if snapshot is not None else None, jobs)
+        diff.added = [Job(**job) for job in diff.added]
+        diff.changed = [Job(**job) for job in diff.changed]
+        diff.unchanged = [Job(**job) for job in diff.unchanged]
+        if snapshot is not None:
+            logger.info(
+                f"{source_url} changed: {len(diff.added)} added, {len(diff.changed)} changed, "
+                f"{len(diff.removed)} removed"
+            )
+        return diff
+
+    async def scrape_job_postings(self, source_urls: list[str], run: Run | None = None) -> "list[Job]":
+        """Jobs on every source page; with a `run`, pages it already listed are served from its journal"""
+        from .models import Job
+
+        listings = run.outputs("listings") if run is not None else {}
+        pending = [url for url in source_urls if url not in listings]
+        diffs = await asyncio.gather(
+            *(self.diff_job_postings(url) for url in pending),
+            return_exceptions=True,
         )
 
-        jobs = []
-        for job in response.data:
-            # Try dot notation first, fall back to dict if needed
-            if hasattr(job.extract, "jobs"):
-                jobs.extend(job.extract.jobs)
-            else:
-                jobs.extend(job.extract["jobs"])
+        errors = []
+        for url, diff in zip(pending, diffs):
+            if isinstance(diff, Exception):
+                logger.error(f"Error scraping job postings from {url}: {str(diff)}")
+                errors.append(diff)
+                continue
+            listings[url] = [job.model_dump() for job in diff.jobs]
+            if run is not None:
+                run.put("listings", url, listings[url])
+
+        if errors and len(errors) == len(source_urls):
+            raise errors[0]
+
+        return [Job(**job) for url in source_urls for job in listings.get(url, [])]
+
+    @timed("scrape_job_content")
+    async def scrape_job_content(self, job_url: str, run: Run | None = None) -> str:
+        """A posting's markdown; with a `run`, postings it already fetched are served from its journal"""
+        if run is not None:
+            content = run.get("content", job_url)
+            if content is not None:
+                return content
+        content = await _content_flight.do(job_url, lambda: self._fetch_job_content(job_url))
+        if run is not None:
+            run.put("content", job_url, content)
+        return content
+
+    async def _fetch_job_content(self, job_url: str) -> str:
+        page = self.cache.get(job_url)
+        if page is not None:
+            if self.cache.is_fresh(page):
+                count("cache_hits", cache="page")
+                return page.markdown
+            if await self._unchanged(job_url, page):
+                self.cache.touch(job_url)
+                count("cache_hits", cache="page")
+                count("revalidations")
+                return page.markdown
 
-        return [Job(**job) for job in jobs]
+        count("cache_misses", cache="page")
 
-    async def scrape_job_content(self, job_url: str) -> str:
-        response = self.app.scrape_url(url=job_url)
-        return response.markdown
\ No newline at end of file
+        # No HEAD alongside the scrape: the validators come with Firecrawl's metadata when it has them
+        data = await self._scrape(job_url, formats=["markdown"])
+        etag, last_modified = validators(data.get("metadata"))
+        self.cache.put(job_url, data["markdown"], etag, last_modified)
+        return data["markdown"]
@@ -0,0 +1,73 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from .metrics import count
+
+T = TypeVar("T")
+
+
+class Abandoned(Exception):
+    """The shared call was cancelled before it finished; whoever awaited it should retry"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the call; everyone else asking for that
+    key while it is in flight awaits the same result (or exception). Results
+    are shared through `concurrent.futures.Future`s, so callers on different
+    event loops, e.g. separate Streamlit sessions, are coalesced too.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, concurrent.futures.Future] = {}
+
+    def claim(self, key: Hashable) -> tuple[concurrent.futures.Future, bool]:
+        """Return the future for `key` and whether the caller must produce its result"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                count("coalesced", kind=self.name)
+                return future, False
+            future = self._calls[key] = concurrent.futures.Future()
+            return future, True
+
+    def settle(self, key: Hashable, future: concurrent.futures.Future, result=None, error: BaseException | None = None):
+        """Publish the outcome of a claimed call to everyone awaiting it"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if isinstance(error, asyncio.CancelledError):
+            error = Abandoned(f"{self.name} call for {key!r} was cancelled")
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    async def wait(future: concurrent.futures.Future):
+        # Shielded so a follower that is cancelled doesn't cancel the call others share
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future, leader = self.claim(key)
+            if leader:
+                break
+            try:
+                return await self.wait(future)
+            except Abandoned:
+                continue
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, result)
+        return result
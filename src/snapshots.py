@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .cache import content_hash, open_db
+
+# Text that changes on every visit without the listings changing
+VOLATILE = [
+    re.compile(r"\b\d+\+?\s*(second|minute|hour|day|week|month)s?\s+ago\b", re.IGNORECASE),
+    re.compile(r"\b(posted\s+)?(today|yesterday|just now)\b", re.IGNORECASE),
+    # Tracking and session parameters; the rest of a query string (e.g. ?gh_jid=123) can identify the job
+    re.compile(
+        r"[?&;](utm_\w+|gclid|fbclid|msclkid|mc_[ce]id|_ga|_gl|ref|trk|sessionid|session_id|sid|jsessionid|phpsessid)"
+        r"=[^&#)\s]*",
+        re.IGNORECASE,
+    ),
+]
+
+
+def fingerprint(markdown: str) -> str:
+    """Hash of a source page's markdown with volatile text and whitespace normalized away"""
+    for pattern in VOLATILE:
+        markdown = pattern.sub("", markdown)
+    return content_hash(" ".join(markdown.split()))
+
+
+@dataclass
+class SourceSnapshot:
+    url: str
+    fingerprint: str
+    etag: str | None
+    last_modified: str | None
+    jobs: list[dict]
+    extracted_at: float
+    checked_at: float
+
+
+@dataclass
+class ListingDiff:
+    """The jobs on one source page, split by how they changed since the last snapshot"""
+    source_url: str
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    extracted: bool = False
+
+    @property
+    def jobs(self) -> list:
+        return self.added + self.changed + self.unchanged
+
+    @property
+    def new_or_changed(self) -> list:
+        return self.added + self.changed
+
+
+def _identity(job: dict) -> tuple:
+    # Extraction is not perfectly stable, so compare case- and whitespace-insensitively
+    return tuple(" ".join(str(job.get(key, "")).split()).casefold() for key in ("title", "company"))
+
+
+def diff_listings(source_url: str, previous: list[dict] | None, current: list[dict]) -> ListingDiff:
+    before = {job["url"]: job for job in previous or []}
+    diff = ListingDiff(source_url, extracted=True)
+    seen = set()
+    for job in current:
+        if job["url"] in seen:
+            continue
+        seen.add(job["url"])
+        if job["url"] not in before:
+            diff.added.append(job)
+        elif _identity(before[job["url"]]) != _identity(job):
+            diff.changed.append(job)
+        else:
+            diff.unchanged.append(job)
+    diff.removed = [url for url in before if url not in seen]
+    return diff
+
+
+class SourceSnapshots:
+    """
+    Last known state of every job-board page.
+
+    Each source keeps the fingerprint of its markdown, its ETag/Last-Modified
+    and the jobs extracted from it, so an unchanged page can be served without
+    running Firecrawl's LLM extraction again.
+
+    `checked_at` is when the page's markdown was last compared with the
+    snapshot. Matching validators only answer from the snapshot within
+    `max_age` of that: JS-rendered boards often serve a static HTML shell whose
+    validators never change, so past it the markdown is always compared again.
+    """
+
+    def __init__(self, filename: str = "sources.db", max_age: float | None = None):
+        self.max_age = max_age if max_age is not None else float(os.getenv("SOURCE_SNAPSHOT_MAX_AGE_HOURS", "1")) * 3600
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                url TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                jobs TEXT NOT NULL,
+                extracted_at REAL NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, url: str) -> SourceSnapshot | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT url, fingerprint, etag, last_modified, jobs, extracted_at, checked_at FROM sources WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return SourceSnapshot(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], row[6])
+
+    def put(self, url: str, fingerprint: str, jobs: list[dict], etag: str | None = None, last_modified: str | None = None):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO sources (url, fingerprint, etag, last_modified, jobs, extracted_at, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, fingerprint, etag, last_modified, json.dumps(jobs), now, now),
+            )
+
+    def is_fresh(self, snapshot: SourceSnapshot) -> bool:
+        """Whether matching validators may still stand in for comparing the page's markdown"""
+        return time.time() - snapshot.checked_at < self.max_age
+
+    def touch(self, url: str, etag: str | None = None, last_modified: str | None = None):
+        """Mark the snapshot as still current after comparing markdown, refreshing its validators when new ones are known"""
+        with self._lock:
+            self.conn.execute(
+                """
+                UPDATE sources SET checked_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), etag, last_modified, url),
+            )
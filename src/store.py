@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+from .cache import open_db
+
+
+class ProcessedJobStore:
+    """
+    Durable record of every job the scheduler has evaluated.
+
+    Each job is written in its own transaction as soon as it is evaluated, so
+    a crash mid-batch only loses the job that was in flight.
+    """
+
+    def __init__(self, filename: str = "scheduler.db"):
+        self._lock = threading.Lock()
+        self.conn = open_db(filename)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_jobs (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                evaluated_at REAL NOT NULL,
+                result TEXT,
+                score INTEGER,
+                prefilter TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(processed_jobs)")}
+        if "prefilter" not in columns:
+            self.conn.execute("ALTER TABLE processed_jobs ADD COLUMN prefilter TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS processed_jobs_score ON processed_jobs (score)")
+
+    def is_unchanged(self, url: str, content_hash: str, resume_hash: str, prefilter: str | None = None) -> bool:
+        """
+        Whether the job was already evaluated against this exact content and resume.
+
+        A job the pre-filter skipped only counts under the same pre-filter
+        `prefilter` settings, so loosening them brings it back for evaluation.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content_hash, resume_hash, prefilter FROM processed_jobs WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None and row[:2] == (content_hash, resume_hash) and row[2] in (None, prefilter)
+
+    def is_evaluated(self, url: str, resume_hash: str, prefilter: str | None = None) -> bool:
+        """Whether the job was already evaluated (or pre-filtered under these settings) against this resume"""
+        with self._lock:
+            row = self.conn.execute("SELECT resume_hash, prefilter FROM processed_jobs WHERE url = ?", (url,)).fetchone()
+        return row is not None and row[0] == resume_hash and row[1] in (None, prefilter)
+
+    def touch(self, url: str):
+        with self._lock:
+            self.conn.execute("UPDATE processed_jobs SET last_seen = ? WHERE url = ?", (time.time(), url))
+
+    def record(self, url: str, content_hash: str, resume_hash: str, result: dict | None = None, prefilter: str | None = None):
+        """Record an evaluated job, or with `prefilter` (its settings) one the pre-filter skipped"""
+        score = None
+        if result is not None:
+            try:
+                score = int(result.get("match_score"))
+            except (ValueError, TypeError):
+                score = 0
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO processed_jobs
+                    (url, content_hash, resume_hash, last_seen, evaluated_at, result, score, prefilter)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, content_hash, resume_hash, now, now, json.dumps(result) if result is not None else None, score, prefilter),
+            )
+
+    def get(self, url: str) -> dict | None:
+        with self._lock:
+            row = self.conn.execute("SELECT result FROM processed_jobs WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
@@ -0,0 +1,124 @@
+"""
+Run the analyses the app queues, outside the Streamlit server:
+
+    python -m src.worker
+
+With ANALYSIS_WORKER=1 the app only submits analyses to the queue and polls
+their progress. Every session's analyses run here, at most
+WORKER_CONCURRENCY at a time, sharing one scraper and the process-wide rate
+limiters, so the load on Firecrawl and the LLM is governed in one place.
+"""
+import asyncio
+import logging
+import os
+import socket
+
+from dotenv import load_dotenv
+
+from . import metrics
+from .analysis import AnalysisPipeline, NothingToAnalyze
+from .history import MatchHistory
+from .jobqueue import AnalysisQueue
+from .runs import RunJournal
+from .scraper import JobScraper
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+class AnalysisWorker:
+    def __init__(self):
+        self.queue = AnalysisQueue()
+        self.scraper = JobScraper()
+        self.journal = RunJournal()
+        self.history = MatchHistory()
+        self.concurrency = int(os.getenv("WORKER_CONCURRENCY", "2"))
+        self.poll_interval = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.active: dict[str, asyncio.Task] = {}
+
+        logger.info(f"Initialized worker {self.name} running up to {self.concurrency} analyses at once")
+
+    async def analyze(self, analysis_id: str, request):
+        """Run one claimed analysis, writing its progress and results to the queue as they arrive"""
+        run_metrics = metrics.collect()
+        pipeline = AnalysisPipeline(request, self.scraper, self.journal, self.history, "worker")
+        try:
+            self.queue.update(analysis_id, stage="Parsing resume...")
+            await pipeline.load_resume()
+            self.queue.update(analysis_id, run_id=pipeline.run.id, resumed=int(pipeline.run.resumed), stage="Scraping job postings...")
+            await pipeline.scrape()
+            self.queue.update(analysis_id, total=len(pipeline.jobs), stage=f"Fetching {len(pipeline.jobs)} job descriptions...")
+            # An analysis requeued after its worker stopped keeps the results it already has
+            recorded = {job.url for _, job, _ in self.queue.results(analysis_id)}
+
+            def unrecorded(pairs):
+                return [(job, result) for job, result in pairs if job.url not in recorded]
+
+            self.queue.add_results(analysis_id, unrecorded(await pipeline.fetch()))
+            restored = pipeline.select()
+            self.queue.add_results(analysis_id, unrecorded(restored))
+            self.queue.update(
+                analysis_id, skipped=pipeline.skipped, stage=f"Analyzing {len(pipeline.selected)} jobs..."
+            )
+            async for batch_results in pipeline.evaluate():
+                self.queue.add_results(analysis_id, unrecorded(batch_results))
+            pipeline.complete()
+            self.queue.complete(analysis_id)
+            logger.info(f"Analysis {analysis_id} complete: {len(pipeline.jobs)} jobs")
+        except asyncio.CancelledError:
+            logger.info(f"Analysis {analysis_id} cancelled")
+        except NothingToAnalyze as e:
+            self.queue.fail(analysis_id, str(e))
+        except Exception as e:
+            logger.error(f"Analysis {analysis_id} failed: {str(e)}")
+            self.queue.fail(analysis_id, str(e))
+        finally:
+            logger.info(f"Analysis {analysis_id} timings: {run_metrics.summary()}")
+
+    def _claim(self):
+        while len(self.active) < self.concurrency:
+            claimed = self.queue.claim(self.name)
+            if claimed is None:
+                return
+            analysis_id, request = claimed
+            logger.info(f"Claimed analysis {analysis_id} of {len(request.job_urls)} job URLs")
+            task = asyncio.create_task(self.analyze(analysis_id, request))
+            self.active[analysis_id] = task
+            task.add_done_callback(lambda _, analysis_id=analysis_id: self.active.pop(analysis_id, None))
+
+    async def run(self):
+        """Poll the queue, keeping up to `concurrency` analyses running"""
+        logger.info("Starting analysis worker...")
+        try:
+            while True:
+                try:
+                    for analysis_id in self.queue.heartbeat(list(self.active)):
+                        self.active[analysis_id].cancel()
+                    self._claim()
+                except Exception as e:
+                    logger.error(f"Worker error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            # Interrupted analyses stay 'running' until they go stale, then another worker resumes them
+            tasks = list(self.active.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main():
+    metrics.configure_from_env()
+    worker = AnalysisWorker()
+    try:
+        await worker.run()
+    finally:
+        await worker.scraper.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(main())